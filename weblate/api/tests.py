@@ -735,6 +735,8 @@ class MetricsAPITest(APIBaseTest):
         self.authenticate()
         response = self.client.get(reverse('api:metrics'))
         self.assertEqual(response.data['projects'], 1)
+        self.assertIn('weblate', response.data['machinery_latency'])
+        self.assertIn('check_times', response.data)
 
     def test_forbidden(self):
         response = self.client.get(reverse('api:metrics'))
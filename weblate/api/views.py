@@ -44,13 +44,17 @@ from weblate.api.serializers import (
     UploadRequestSerializer, ScreenshotFileSerializer,
 )
 from weblate.auth.models import User
+from weblate.checks.analysis import get_check_times
 from weblate.checks.models import Check
 from weblate.formats.exporters import EXPORTERS
+from weblate.machinery import MACHINE_TRANSLATION_SERVICES
 from weblate.trans.models import (
     Project, Component, Translation, Change, Unit, Source, Suggestion,
 )
+from weblate.trans.search import Fulltext
 from weblate.trans.stats import get_project_stats
 from weblate.lang.models import Language
+from weblate.memory.storage import TranslationMemory
 from weblate.screenshots.models import Screenshot
 from weblate.utils.views import download_translation_file
 from weblate.utils.celery import get_queue_length
@@ -651,5 +655,13 @@ class Metrics(APIView):
             'index_updates': get_queue_length('search'),
             'celery_queue': get_queue_length(),
             'celery_memory_queue': get_queue_length('memory'),
+            'index_commit_time': Fulltext.get_commit_time(),
+            'memory_commit_time': TranslationMemory.get_commit_time(),
+            'memory_lookup_time': TranslationMemory.get_lookup_time(),
+            'machinery_latency': {
+                key: service.get_latency()
+                for key, service in MACHINE_TRANSLATION_SERVICES.items()
+            },
+            'check_times': get_check_times(),
             'name': settings.SITE_TITLE,
         })
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2019 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Shared analysis of strings and timing of checks.
+
+The checks and highlighting scan same strings using same expressions
+repeatedly (for example all C format checks or check and highlight of a
+format string), the results are cached here so that every string is
+scanned only once.
+"""
+
+from __future__ import unicode_literals
+
+from collections import OrderedDict, defaultdict
+import threading
+import time
+
+from django.core.cache import cache
+
+from weblate.utils.cache import add_to_cache
+
+# Maximal number of cached analysis results
+ANALYSIS_SIZE = 10000
+
+# How often accumulated check times are stored in the cache
+FLUSH_INTERVAL = 60
+
+CHECK_TIMES_KEY = 'check-times-{0}-{1}'
+
+try:
+    process_time = time.process_time
+except AttributeError:
+    # Python 2
+    process_time = time.clock
+
+ANALYSIS = OrderedDict()
+ANALYSIS_LOCK = threading.Lock()
+TIMES = {
+    'data': defaultdict(lambda: [0, 0.0]),
+    'flushed': time.time(),
+    'lock': threading.Lock(),
+}
+
+
+def analyze(function, *args):
+    """Return cached result of function.
+
+    The function has to be pure and the result must not be modified by
+    the caller.
+    """
+    key = (function, ) + args
+    with ANALYSIS_LOCK:
+        try:
+            # Move the result to the end as most recently used
+            result = ANALYSIS[key] = ANALYSIS.pop(key)
+            return result
+        except KeyError:
+            pass
+    result = function(*args)
+    with ANALYSIS_LOCK:
+        ANALYSIS[key] = result
+        # Remove least recently used results
+        while len(ANALYSIS) > ANALYSIS_SIZE:
+            ANALYSIS.popitem(last=False)
+    return result
+
+
+def scan(regexp, text):
+    """Return tuple of (start, end, match, groups) for all matches."""
+    return tuple(
+        (match.start(), match.end(), match.group(), match.groups())
+        for match in regexp.finditer(text)
+    )
+
+
+def find_matches(regexp, text):
+    """Return cached matches of regexp in text, see scan."""
+    return analyze(scan, regexp, text)
+
+
+def record_check_time(check, duration):
+    """Record CPU time spent in a check."""
+    with TIMES['lock']:
+        item = TIMES['data'][check]
+        item[0] += 1
+        item[1] += duration
+        if time.time() - TIMES['flushed'] > FLUSH_INTERVAL:
+            flush_check_times()
+
+
+def flush_check_times():
+    """Add check times accumulated in this process to the cache.
+
+    The time is stored in microseconds as the cache can increment only
+    integers.
+    """
+    data = TIMES['data']
+    TIMES['flushed'] = time.time()
+    for check, (count, duration) in data.items():
+        add_to_cache(CHECK_TIMES_KEY.format(check, 'count'), count)
+        add_to_cache(
+            CHECK_TIMES_KEY.format(check, 'time'),
+            int(round(duration * 1000000))
+        )
+    data.clear()
+
+
+def get_check_times():
+    """Return CPU time spent in checks.
+
+    The result is dictionary of check id to number of calls and total
+    time in seconds.
+    """
+    from weblate.checks import CHECKS
+    with TIMES['lock']:
+        flush_check_times()
+    stored = cache.get_many([
+        CHECK_TIMES_KEY.format(check, name)
+        for check in CHECKS for name in ('count', 'time')
+    ])
+    result = {}
+    for check in CHECKS:
+        count = CHECK_TIMES_KEY.format(check, 'count')
+        if count in stored:
+            result[check] = {
+                'count': stored[count],
+                'time': stored.get(
+                    CHECK_TIMES_KEY.format(check, 'time'), 0
+                ) / 1000000.0,
+            }
+    return result
@@ -21,6 +21,7 @@
 
 import re
 from django.utils.translation import ugettext_lazy as _
+from weblate.checks.analysis import find_matches
 from weblate.checks.base import TargetCheck
 
 ANGULARJS_INTERPOLATION_MATCH = re.compile(
@@ -46,29 +47,30 @@ class AngularJSInterpolationCheck(TargetCheck):
     severity = 'danger'
 
     def check_single(self, source, target, unit):
-        src_match = ANGULARJS_INTERPOLATION_MATCH.findall(source)
+        src_match = find_matches(ANGULARJS_INTERPOLATION_MATCH, source)
 
         # Any interpolation strings in source?
         if not src_match:
             return False
 
-        tgt_match = ANGULARJS_INTERPOLATION_MATCH.findall(target)
+        tgt_match = find_matches(ANGULARJS_INTERPOLATION_MATCH, target)
 
         # Fail the check if the number of matches is different
         if len(src_match) != len(tgt_match):
             return True
 
         # Remove whitespace
-        src_tags = {re.sub(WHITESPACE, '', x) for x in src_match}
-        tgt_tags = {re.sub(WHITESPACE, '', x) for x in tgt_match}
+        src_tags = {re.sub(WHITESPACE, '', x[3][0]) for x in src_match}
+        tgt_tags = {re.sub(WHITESPACE, '', x[3][0]) for x in tgt_match}
 
         return src_tags != tgt_tags
 
     def check_highlight(self, source, unit):
         if self.should_skip(unit):
             return []
-        ret = []
-        match_objects = ANGULARJS_INTERPOLATION_MATCH.finditer(source)
-        for match in match_objects:
-            ret.append((match.start(), match.end(), match.group()))
-        return ret
+        return [
+            (start, end, text)
+            for start, end, text, groups in find_matches(
+                ANGULARJS_INTERPOLATION_MATCH, source
+            )
+        ]
@@ -22,6 +22,7 @@ import re
 
 from django.utils.translation import ugettext_lazy as _
 
+from weblate.checks.analysis import find_matches
 from weblate.checks.base import TargetCheck
 
 PYTHON_PRINTF_MATCH = re.compile(
@@ -214,9 +215,9 @@ class BaseFormatCheck(TargetCheck):
 
         # Calculate value
         src_matches = [
-            self.cleanup_string(x[0])
-            for x in self.regexp.findall(source)
-            if x[0] != '%'
+            self.cleanup_string(x[3][0])
+            for x in find_matches(self.regexp, source)
+            if x[3][0] != '%'
         ]
         if src_matches:
             uses_position = max(
@@ -224,9 +225,9 @@ class BaseFormatCheck(TargetCheck):
             )
 
         tgt_matches = [
-            self.cleanup_string(x[0])
-            for x in self.regexp.findall(target)
-            if x[0] != '%'
+            self.cleanup_string(x[3][0])
+            for x in find_matches(self.regexp, target)
+            if x[3][0] != '%'
         ]
 
         if not uses_position:
@@ -252,11 +253,10 @@ class BaseFormatCheck(TargetCheck):
     def check_highlight(self, source, unit):
         if self.should_skip(unit):
             return []
-        ret = []
-        match_objects = self.regexp.finditer(source)
-        for match in match_objects:
-            ret.append((match.start(), match.end(), match.group()))
-        return ret
+        return [
+            (start, end, text)
+            for start, end, text, groups in find_matches(self.regexp, source)
+        ]
 
 
 class PythonFormatCheck(BaseFormatCheck):
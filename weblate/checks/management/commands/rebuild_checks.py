@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2019 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Re-evaluation of all checks in pool of worker processes."""
+
+from __future__ import unicode_literals
+
+import multiprocessing
+import time
+
+from django.db import connections
+from django.db.models import Min
+
+from weblate.trans.management.commands import WeblateLangCommand
+from weblate.trans.models import Source, Translation, Unit
+
+# Number of units processed at once
+BATCH_SIZE = 1000
+
+
+def recheck_batch(translation, units, sources):
+    """Re-evaluate checks for batch of units of single translation."""
+    source_info = {
+        source.id_hash: source
+        for source in Source.objects.filter(
+            component=translation.component,
+            id_hash__in=[unit.id_hash for unit in units]
+        )
+    }
+    for unit in units:
+        unit.translation = translation
+        if unit.id_hash in source_info:
+            unit.__dict__['source_info'] = source_info[unit.id_hash]
+
+    # Force update of has_failing_check to fix possibly stale flags
+    Unit.run_checks_batch(
+        translation, [(unit, True, False, False) for unit in units]
+    )
+
+    if sources:
+        project = translation.component.project
+        for unit in units:
+            if unit.id_hash in source_info:
+                source_info[unit.id_hash].run_checks(unit, project)
+
+
+def recheck_translation(job):
+    """Re-evaluate checks for single translation.
+
+    Returns tuple of translation id and number of processed units.
+    """
+    pk, sources = job
+    translation = Translation.objects.prefetch().get(pk=pk)
+    count = 0
+    units = []
+    for unit in translation.unit_set.order_by('pk').iterator():
+        units.append(unit)
+        if len(units) >= BATCH_SIZE:
+            recheck_batch(translation, units, sources)
+            count += len(units)
+            units = []
+    if units:
+        recheck_batch(translation, units, sources)
+        count += len(units)
+    translation.invalidate_cache()
+    return pk, count
+
+
+class Command(WeblateLangCommand):
+    help = 're-evaluates all checks in parallel'
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=multiprocessing.cpu_count(),
+            help='Number of worker processes to use',
+        )
+        parser.add_argument(
+            '--start',
+            type=int,
+            default=0,
+            help='Resume processing from given translation id',
+        )
+
+    def get_jobs(self, **options):
+        """Return list of (translation id, run source checks) tuples.
+
+        Source checks are run together with first translation of each
+        component.
+        """
+        translations = self.get_translations(**options).order_by()
+        first = set(
+            translations.values('component').annotate(
+                first=Min('pk')
+            ).values_list('first', flat=True)
+        )
+        pks = translations.filter(
+            pk__gte=options['start']
+        ).order_by('pk').values_list('pk', flat=True)
+        return [(pk, pk in first) for pk in pks]
+
+    def create_pool(self, processes):
+        """Create pool of worker processes."""
+        # The forked workers have to open own database connections
+        connections.close_all()
+        return multiprocessing.Pool(processes)
+
+    def run_jobs(self, jobs, processes):
+        """Yield results of recheck_translation in order of jobs."""
+        if processes < 2 or len(jobs) < 2:
+            for job in jobs:
+                yield recheck_translation(job)
+            return
+        pool = self.create_pool(processes)
+        try:
+            for result in pool.imap(recheck_translation, jobs):
+                yield result
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def handle(self, *args, **options):
+        jobs = self.get_jobs(**options)
+        started = time.time()
+        total = 0
+        for pk, count in self.run_jobs(jobs, options['processes']):
+            total += count
+            elapsed = time.time() - started
+            self.stdout.write(
+                'Translation {0} done, {1} units, {2:.1f} units/s'.format(
+                    pk, count, total / elapsed if elapsed else 0
+                )
+            )
+        elapsed = time.time() - started
+        self.stdout.write(
+            'Processed {0} units in {1:.1f} s, {2:.1f} units/s'.format(
+                total, elapsed, total / elapsed if elapsed else 0
+            )
+        )
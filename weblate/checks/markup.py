@@ -29,6 +29,7 @@ from django.core.validators import URLValidator
 from django.utils.functional import cached_property
 from django.utils.translation import ugettext_lazy as _
 
+from weblate.checks.analysis import find_matches
 from weblate.checks.base import TargetCheck
 
 BBCODE_MATCH = re.compile(
@@ -80,17 +81,17 @@ class BBCodeCheck(TargetCheck):
 
     def check_single(self, source, target, unit):
         # Parse source
-        src_match = BBCODE_MATCH.findall(source)
+        src_match = find_matches(BBCODE_MATCH, source)
         # Any BBCode in source?
         if not src_match:
             return False
         # Parse target
-        tgt_match = BBCODE_MATCH.findall(target)
+        tgt_match = find_matches(BBCODE_MATCH, target)
         if len(src_match) != len(tgt_match):
             return True
 
-        src_tags = {x[1] for x in src_match}
-        tgt_tags = {x[1] for x in tgt_match}
+        src_tags = {x[3][1] for x in src_match}
+        tgt_tags = {x[3][1] for x in tgt_match}
 
         return src_tags != tgt_tags
 
@@ -127,7 +128,7 @@ class BaseXMLCheck(TargetCheck):
         """Quick check if source looks like XML."""
         if 'xml-text' in flags:
             return True
-        return '<' in source and len(XML_MATCH.findall(source))
+        return '<' in source and len(find_matches(XML_MATCH, source))
 
     def check_single(self, source, target, unit):
         """Check for single phrase, not dealing with plurals."""
@@ -200,10 +201,9 @@ class XMLTagsCheck(BaseXMLCheck):
             self.parse_xml(source)
         except SyntaxError:
             return ret
-        for match in XML_MATCH.finditer(source):
-            ret.append((match.start(), match.end(), match.group()))
-        for match in XML_ENTITY_MATCH.finditer(source):
-            ret.append((match.start(), match.end(), match.group()))
+        for regexp in (XML_MATCH, XML_ENTITY_MATCH):
+            for start, end, text, groups in find_matches(regexp, source):
+                ret.append((start, end, text))
         return ret
 
 
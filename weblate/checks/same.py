@@ -25,6 +25,7 @@ import re
 from django.utils.html import strip_tags
 from django.utils.translation import ugettext_lazy as _
 
+from weblate.checks.analysis import analyze
 from weblate.checks.base import TargetCheck
 from weblate.checks.format import (
     PYTHON_PRINTF_MATCH, PHP_PRINTF_MATCH, C_PRINTF_MATCH,
@@ -165,7 +166,9 @@ class SameCheck(TargetCheck):
             result = True
         else:
             # Strip format strings
-            stripped = strip_string(lower_source, unit.all_flags)
+            stripped = analyze(
+                strip_string, lower_source, frozenset(unit.all_flags)
+            )
 
             # Ignore strings which don't contain any string to translate
             # or just single letter (usually unit or something like that)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2019 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""
+Tests for shared analysis of strings.
+"""
+
+from unittest import TestCase
+
+from django.core.cache import cache
+
+from weblate.checks import analysis
+from weblate.checks.analysis import (
+    ANALYSIS, CHECK_TIMES_KEY, TIMES, analyze, find_matches,
+    flush_check_times, get_check_times, record_check_time,
+)
+from weblate.checks.format import C_PRINTF_MATCH
+
+
+class AnalysisTest(TestCase):
+    def test_find_matches(self):
+        self.assertEqual(
+            find_matches(C_PRINTF_MATCH, 'Hello %s %%'),
+            (
+                (6, 8, '%s', ('s', None, 's', None, 's')),
+                (9, 11, '%%', ('%', None, '%', None, '%')),
+            )
+        )
+
+    def test_cached(self):
+        calls = []
+
+        def function(text):
+            calls.append(text)
+            return text.upper()
+
+        self.assertEqual(analyze(function, 'text'), 'TEXT')
+        self.assertEqual(analyze(function, 'text'), 'TEXT')
+        self.assertEqual(calls, ['text'])
+        self.assertIn((function, 'text'), ANALYSIS)
+
+    def test_least_recently_used(self):
+        orig_size = analysis.ANALYSIS_SIZE
+        analysis.ANALYSIS_SIZE = 2
+        try:
+            ANALYSIS.clear()
+            analyze(len, 'a')
+            analyze(len, 'b')
+            analyze(len, 'a')
+            analyze(len, 'c')
+            self.assertEqual(
+                list(ANALYSIS.keys()),
+                [(len, 'a'), (len, 'c')]
+            )
+        finally:
+            analysis.ANALYSIS_SIZE = orig_size
+
+    def test_check_times(self):
+        flush_check_times()
+        cache.clear()
+        record_check_time('same', 0.5)
+        record_check_time('same', 0.25)
+        self.assertEqual(
+            get_check_times(),
+            {'same': {'count': 2, 'time': 0.75}}
+        )
+
+    def test_check_times_sum(self):
+        flush_check_times()
+        cache.clear()
+        # Times flushed by other process
+        cache.set(CHECK_TIMES_KEY.format('same', 'count'), 3)
+        cache.set(CHECK_TIMES_KEY.format('same', 'time'), 1000000)
+        TIMES['data']['same'] = [1, 0.5]
+        flush_check_times()
+        self.assertEqual(
+            get_check_times(),
+            {'same': {'count': 4, 'time': 1.5}}
+        )
@@ -24,6 +24,9 @@ from six import StringIO
 
 from django.core.management import call_command
 
+from weblate.checks.management.commands import rebuild_checks
+from weblate.checks.models import Check
+from weblate.trans.models import Unit
 from weblate.trans.tests.test_models import RepoTestCase
 from weblate.trans.tests.test_commands import CheckGitTest
 
@@ -68,6 +71,95 @@ class PeriodicCommandTest(RepoTestCase):
         self.assertEqual(1, len(output.getvalue().splitlines()))
 
 
+class SerialPool(object):
+    """Process pool replacement running the jobs in current process.
+
+    The test database can not be shared with worker processes.
+    """
+    def __init__(self, processes):
+        self.processes = processes
+        self.terminated = False
+
+    def imap(self, func, iterable):
+        for item in iterable:
+            yield func(item)
+
+    def terminate(self):
+        self.terminated = True
+
+    def join(self):
+        return
+
+
 class UpdateChecksTest(CheckGitTest):
     command_name = 'updatechecks'
     expected_string = 'Processing'
+
+
+class RebuildChecksTest(CheckGitTest):
+    command_name = 'rebuild_checks'
+    expected_string = 'units/s'
+
+    def do_test(self, *args, **kwargs):
+        # The test database can not be shared with worker processes
+        kwargs['processes'] = 1
+        super(RebuildChecksTest, self).do_test(*args, **kwargs)
+
+    def test_stale(self):
+        self.edit_unit('Hello, world!\n', 'Hello, world!\n')
+        Check.objects.all().delete()
+        Unit.objects.update(has_failing_check=False)
+        self.do_test('test/test')
+        self.assertTrue(
+            Check.objects.filter(check='same', language__code='cs').exists()
+        )
+        self.assertTrue(self.get_unit().has_failing_check)
+
+    def test_start(self):
+        Check.objects.all().delete()
+        last = self.component.translation_set.order_by('-pk')[0]
+        self.do_test('test/test', start=last.pk)
+        self.assertFalse(
+            Check.objects.exclude(language=last.language).exists()
+        )
+
+    def test_pool(self):
+        pools = []
+
+        def create_pool(command, processes):
+            pools.append(SerialPool(processes))
+            return pools[-1]
+
+        Check.objects.all().delete()
+        # Keep the database connection of the test transaction open
+        orig_create_pool = rebuild_checks.Command.create_pool
+        rebuild_checks.Command.create_pool = create_pool
+        try:
+            output = StringIO()
+            call_command(
+                self.command_name, 'test/test', processes=2, stdout=output
+            )
+        finally:
+            rebuild_checks.Command.create_pool = orig_create_pool
+        self.assertEqual(len(pools), 1)
+        self.assertEqual(pools[0].processes, 2)
+        self.assertTrue(pools[0].terminated)
+        # Results are reported for every translation in order
+        translations = self.component.translation_set.order_by('pk')
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), translations.count() + 1)
+        for line, translation in zip(lines, translations):
+            self.assertTrue(
+                line.startswith('Translation {0} done, {1} units'.format(
+                    translation.pk, translation.unit_set.count()
+                ))
+            )
+        self.assertIn(
+            'Processed {0} units'.format(
+                Unit.objects.filter(
+                    translation__component=self.component
+                ).count()
+            ),
+            lines[-1]
+        )
+        self.assertTrue(Check.objects.exists())
@@ -220,9 +220,34 @@ class TranslationFormat(object):
     def load(cls, storefile):
         raise NotImplementedError()
 
+    def get_plural_formula(self):
+        """Return plural number and equation defined in the file.
+
+        None is returned for formats which do not store plurals definition.
+        """
+        return None
+
     def get_plural(self, language):
         """Return matching plural object."""
-        return language.plural
+        from weblate.lang.models import Plural
+        formula = self.get_plural_formula()
+        if formula is None:
+            return language.plural
+
+        number, equation = formula
+
+        # Find matching one
+        for plural in language.plural_set.all():
+            if plural.same_plural(number, equation):
+                return plural
+
+        # Create new one
+        return Plural.objects.create(
+            language=language,
+            source=Plural.SOURCE_GETTEXT,
+            number=number,
+            equation=equation,
+        )
 
     @cached_property
     def has_template(self):
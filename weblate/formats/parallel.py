@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2019 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Parsing of translation files in worker processes."""
+
+from __future__ import unicode_literals
+
+import multiprocessing
+import pickle
+
+from django.utils.encoding import force_text
+
+from weblate.formats.base import TranslationFormat
+
+# Parser configuration in the worker process, see init_worker
+WORKER = {}
+
+
+class UnitSnapshot(object):
+    """Picklable copy of parsed translation unit.
+
+    It provides the subset of TranslationUnit interface used when importing
+    units into the database.
+    """
+
+    def __init__(self, unit):
+        self.translatable = unit.is_translatable()
+        self.id_hash = unit.id_hash
+        self.content_hash = unit.content_hash
+        self.locations = unit.locations
+        self.flags = unit.flags
+        self.source = unit.source
+        self.target = unit.target
+        self.context = unit.context
+        self.comments = unit.comments
+        self.previous_source = unit.previous_source
+        # Only presence of the template is checked on import
+        self.template = None if unit.template is None else True
+        self.translated = unit.is_translated()
+        # Store both results to keep the fallback behavior
+        self.fuzzy = (unit.is_fuzzy(False), unit.is_fuzzy(True))
+        self.approved = (unit.is_approved(False), unit.is_approved(True))
+
+    def is_translatable(self):
+        return self.translatable
+
+    def is_translated(self):
+        return self.translated
+
+    def is_fuzzy(self, fallback=False):
+        return self.fuzzy[bool(fallback)]
+
+    def is_approved(self, fallback=False):
+        return self.approved[bool(fallback)]
+
+
+class StoreSnapshot(TranslationFormat):
+    """Picklable copy of parsed translation file.
+
+    It can not be saved, the file has to be loaded again for that.
+    """
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, store):
+        self.plural_formula = store.get_plural_formula()
+        self.all_units = [UnitSnapshot(unit) for unit in store.all_units]
+
+    def get_plural_formula(self):
+        return self.plural_formula
+
+
+def init_worker(file_format, template_store):
+    """Configure parser in the worker process."""
+    WORKER['file_format'] = file_format
+    WORKER['template_store'] = template_store
+
+
+def parse_snapshot(job):
+    """Parse single file in the worker process.
+
+    Returns StoreSnapshot or exception raised while parsing.
+    """
+    filename, language_code = job
+    try:
+        store = WORKER['file_format'].parse(
+            filename, WORKER['template_store'], language_code=language_code
+        )
+        return StoreSnapshot(store)
+    except Exception as error:
+        try:
+            pickle.dumps(error)
+        except Exception:
+            error = ValueError(force_text(error))
+        return error
+
+
+def can_parse_parallel():
+    """Check whether we can start worker processes.
+
+    Daemonic processes are not allowed to have children.
+    """
+    return not multiprocessing.current_process().daemon
+
+
+def parse_parallel(file_format, template_store, jobs, processes):
+    """Parse files in pool of worker processes.
+
+    The jobs is list of (filename, language_code) tuples, the results are
+    yielded in the same order as soon as they are available. The workers
+    are forked, so the template store is not pickled.
+    """
+    pool = multiprocessing.Pool(
+        processes, init_worker, (file_format, template_store)
+    )
+    try:
+        for result in pool.imap(parse_snapshot, jobs):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
@@ -681,27 +681,14 @@ class PoFormat(TTKitFormat):
     autoload = ('.po', '.pot')
     unit_class = PoUnit
 
-    def get_plural(self, language):
-        """Return matching plural object."""
+    def get_plural_formula(self):
+        """Return plural number and equation from the file header."""
         from weblate.lang.models import Plural
         header = self.store.parseheader()
         try:
-            number, equation = Plural.parse_formula(header['Plural-Forms'])
+            return Plural.parse_formula(header['Plural-Forms'])
         except (ValueError, KeyError):
-            return super(PoFormat, self).get_plural(language)
-
-        # Find matching one
-        for plural in language.plural_set.all():
-            if plural.same_plural(number, equation):
-                return plural
-
-        # Create new one
-        return Plural.objects.create(
-            language=language,
-            source=Plural.SOURCE_GETTEXT,
-            number=number,
-            equation=equation,
-        )
+            return None
 
     @classmethod
     def untranslate_store(cls, store, language, fuzzy=False):
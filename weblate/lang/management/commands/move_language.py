@@ -22,6 +22,7 @@ from django.core.management.base import BaseCommand
 
 from weblate.lang.models import Language, Plural
 from weblate.checks.models import Check
+from weblate.trans.models import Dictionary
 
 
 class Command(BaseCommand):
@@ -65,7 +66,13 @@ class Command(BaseCommand):
         for group in source.group_set.all():
             group.languages.remove(source)
             group.languages.add(target)
+        projects = set(
+            source.dictionary_set.values_list('project_id', flat=True)
+        )
         source.dictionary_set.update(language=target)
+        for project_id in projects:
+            Dictionary.objects.invalidate_index(project_id, source.pk)
+            Dictionary.objects.invalidate_index(project_id, target.pk)
         source.comment_set.update(language=target)
 
         for check in source.check_set.all():
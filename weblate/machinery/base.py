@@ -24,21 +24,32 @@ from __future__ import unicode_literals
 from hashlib import md5
 import json
 import random
+from time import time
 
-from six.moves.urllib.request import Request, urlopen
+import requests
+from requests.adapters import HTTPAdapter
+from six.moves.urllib.request import Request
 from six.moves.urllib.error import HTTPError
 
+from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
 from django.utils.http import urlencode
 
 from weblate import USER_AGENT
 from weblate.logger import LOGGER
+from weblate.utils.cache import add_to_cache
 from weblate.utils.errors import report_error
 from weblate.utils.hash import calculate_hash
 from weblate.utils.search import Comparer
 from weblate.utils.site import get_site_url
 
+# Upper bounds of request duration histogram buckets in seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LATENCY_KEYS = tuple(str(bucket) for bucket in LATENCY_BUCKETS) + (
+    '+Inf', 'count', 'sum'
+)
+
 
 class MachineTranslationError(Exception):
     """Generic Machine translation error."""
@@ -55,6 +66,10 @@ class MachineTranslation(object):
     rank_boost = 0
     default_languages = []
     cache_translations = True
+    # Number of concurrent requests made during automatic translation
+    concurrency = 4
+    # Number of strings translated in single request
+    batch_size = 1
     language_map = {}
 
     @classmethod
@@ -66,6 +81,8 @@ class MachineTranslation(object):
         self.mtid = self.name.lower().replace(' ', '-')
         self.rate_limit_cache = '{}-rate-limit'.format(self.mtid)
         self.languages_cache = '{}-languages'.format(self.mtid)
+        self.latency_cache = '{}-latency'.format(self.mtid)
+        self.session = self.create_session()
         self.request_url = None
         self.request_params = None
         self.comparer = Comparer()
@@ -73,7 +90,10 @@ class MachineTranslation(object):
         self.supported_languages_error = None
 
     def delete_cache(self):
-        cache.delete_many([self.rate_limit_cache, self.languages_cache])
+        cache.delete_many(
+            [self.rate_limit_cache, self.languages_cache] +
+            [self.get_latency_key(name) for name in LATENCY_KEYS]
+        )
 
     def get_identifier(self):
         return self.mtid
@@ -82,6 +102,96 @@ class MachineTranslation(object):
         """Hook for backends to allow add authentication headers to request."""
         return
 
+    def create_session(self):
+        """Create HTTP session shared by all threads.
+
+        The session keeps connections to the service alive, so these are
+        reused by subsequent requests. The connection pool is large enough
+        for concurrent requests during automatic translation.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_maxsize=max(self.concurrency, 10)
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get_latency_key(self, name):
+        return '{0}-{1}'.format(self.latency_cache, name)
+
+    def get_latency(self):
+        """Return histogram of request durations."""
+        stored = cache.get_many(
+            [self.get_latency_key(name) for name in LATENCY_KEYS]
+        )
+        result = {
+            name: stored.get(self.get_latency_key(name), 0)
+            for name in LATENCY_KEYS
+        }
+        result['sum'] /= 1000000.0
+        return result
+
+    def record_latency(self, duration):
+        for bucket in LATENCY_BUCKETS:
+            if duration <= bucket:
+                name = str(bucket)
+                break
+        else:
+            name = '+Inf'
+        add_to_cache(self.get_latency_key(name), 1)
+        add_to_cache(self.get_latency_key('count'), 1)
+        # The cache can increment only integers, sum is in microseconds
+        add_to_cache(
+            self.get_latency_key('sum'), int(round(duration * 1000000))
+        )
+
+    def http_request(self, request, data=None):
+        """Perform HTTP request using the pooled session.
+
+        Returns content of the response, HTTPError is raised for error
+        responses same as with urlopen.
+        """
+        headers = dict(request.header_items())
+        if data is not None:
+            headers.setdefault(
+                'Content-type', 'application/x-www-form-urlencoded'
+            )
+        timeout = (settings.MT_CONNECT_TIMEOUT, settings.MT_READ_TIMEOUT)
+        start = time()
+        try:
+            response = self.session.request(
+                'GET' if data is None else 'POST',
+                request.get_full_url(),
+                data=data,
+                headers=headers,
+                timeout=timeout,
+                stream=True,
+            )
+            try:
+                if response.status_code >= 400:
+                    raise HTTPError(
+                        request.get_full_url(),
+                        response.status_code,
+                        response.reason,
+                        response.headers,
+                        None
+                    )
+                content = b''
+                for chunk in response.iter_content(65536):
+                    content += chunk
+                    if len(content) > settings.MT_MAX_RESPONSE_SIZE:
+                        raise MachineTranslationError(
+                            'Response size exceeds {0} bytes'.format(
+                                settings.MT_MAX_RESPONSE_SIZE
+                            )
+                        )
+                return content
+            finally:
+                response.close()
+        finally:
+            self.record_latency(time() - start)
+
     def json_req(self, url, http_post=False, skip_auth=False, raw=False,
                  json_body=False, **kwargs):
         """Perform JSON request."""
@@ -95,7 +205,7 @@ class MachineTranslation(object):
             if json_body:
                 params = json.dumps(kwargs)
             else:
-                params = urlencode(kwargs)
+                params = urlencode(kwargs, doseq=True)
         else:
             if json_body:
                 params = '{}'
@@ -120,12 +230,11 @@ class MachineTranslation(object):
 
         # Fire request
         if http_post:
-            handle = urlopen(request, params.encode('utf-8'), timeout=5.0)
+            text = self.http_request(request, params.encode('utf-8'))
         else:
-            handle = urlopen(request, timeout=5.0)
+            text = self.http_request(request)
 
         # Read and possibly convert response
-        text = handle.read()
         # Needed for Microsoft
         if text[:3] == b'\xef\xbb\xbf':
             text = text.decode('UTF-8-sig')
@@ -261,9 +370,11 @@ class MachineTranslation(object):
             calculate_hash(None, text),
         )
 
-    def translate(self, language, text, unit, request, source=None):
-        """Return list of machine translations."""
+    def get_languages(self, language, unit, request, source=None):
+        """Return source and target language codes for the service.
 
+        None is returned if the service can not be used for the translation.
+        """
         self.get_supported_languages(request)
 
         if source is None:
@@ -272,25 +383,63 @@ class MachineTranslation(object):
                 unit.translation.component.project.source_language.code
             )
 
-        if not text or self.is_rate_limited() or source == language:
-            return []
+        if self.is_rate_limited():
+            return None
 
-        if not self.is_supported(source, language):
+        while source != language:
+            if self.is_supported(source, language):
+                return source, language
             # Try without country code
             source = source.replace('-', '_')
             if '_' in source:
                 source = source.split('_')[0]
-                return self.translate(language, text, unit, request, source)
+                continue
             language = language.replace('-', '_')
             if '_' in language:
                 language = language.split('_')[0]
-                return self.translate(language, text, unit, request, source)
+                continue
             if self.supported_languages_error:
                 raise MachineTranslationError(
                     repr(self.supported_languages_error)
                 )
+            break
+
+        return None
+
+    def format_results(self, translations):
+        return [
+            {
+                'text': trans[0],
+                'quality': trans[1],
+                'service': trans[2],
+                'source': trans[3]
+            }
+            for trans in translations
+        ]
+
+    def handle_error(self, exc, request):
+        """Report failed request and return exception to raise."""
+        if self.is_rate_limit_error(exc):
+            self.set_rate_limit()
+
+        self.report_error(
+            exc, request,
+            'Failed to fetch translations from %s',
+        )
+        return MachineTranslationError('{0}: {1}'.format(
+            exc.__class__.__name__,
+            str(exc)
+        ))
+
+    def translate(self, language, text, unit, request, source=None):
+        """Return list of machine translations."""
+        languages = self.get_languages(language, unit, request, source)
+
+        if not text or languages is None:
             return []
 
+        source, language = languages
+
         cache_key = self.translate_cache_key(source, language, text)
         if cache_key:
             result = cache.get(cache_key)
@@ -301,31 +450,78 @@ class MachineTranslation(object):
             translations = self.download_translations(
                 source, language, text, unit, request
             )
-
-            result = [
-                {
-                    'text': trans[0],
-                    'quality': trans[1],
-                    'service': trans[2],
-                    'source': trans[3]
-                }
-                for trans in translations
-            ]
-            if cache_key:
-                cache.set(cache_key, result, 7 * 86400)
-            return result
         except Exception as exc:
-            if self.is_rate_limit_error(exc):
-                self.set_rate_limit()
+            raise self.handle_error(exc, request)
 
-            self.report_error(
-                exc, request,
-                'Failed to fetch translations from %s',
-            )
-            raise MachineTranslationError('{0}: {1}'.format(
-                exc.__class__.__name__,
-                str(exc)
-            ))
+        result = self.format_results(translations)
+        if cache_key:
+            cache.set(cache_key, result, 7 * 86400)
+        return result
+
+    def download_batch_translations(self, source, language, texts, units,
+                                    request):
+        """Download list of possible translations for several texts.
+
+        Returns list of download_translations results for each of texts.
+        Backends supporting translating multiple strings in single request
+        should override this and set batch_size.
+        """
+        return [
+            self.download_translations(source, language, text, unit, request)
+            for text, unit in zip(texts, units)
+        ]
+
+    def translate_batch(self, language, texts, units, request):
+        """Return list of machine translations for each of texts.
+
+        All units have to belong to same translation. Results already in the
+        cache are used, the remaining texts are downloaded in batches of
+        batch_size strings.
+        """
+        results = [[] for text in texts]
+        if not texts:
+            return results
+
+        languages = self.get_languages(language, units[0], request)
+        if languages is None:
+            return results
+        source, language = languages
+
+        cache_keys = [
+            self.translate_cache_key(source, language, text) for text in texts
+        ]
+        cached = cache.get_many([key for key in cache_keys if key])
+
+        pending = []
+        for pos, text in enumerate(texts):
+            if not text:
+                continue
+            if cache_keys[pos] in cached:
+                results[pos] = cached[cache_keys[pos]]
+            else:
+                pending.append(pos)
+
+        for offset in range(0, len(pending), self.batch_size):
+            batch = pending[offset:offset + self.batch_size]
+            try:
+                translations = self.download_batch_translations(
+                    source,
+                    language,
+                    [texts[pos] for pos in batch],
+                    [units[pos] for pos in batch],
+                    request
+                )
+            except Exception as exc:
+                raise self.handle_error(exc, request)
+
+            store = {}
+            for pos, translation in zip(batch, translations):
+                results[pos] = self.format_results(translation)
+                if cache_keys[pos]:
+                    store[cache_keys[pos]] = results[pos]
+            cache.set_many(store, 7 * 86400)
+
+        return results
 
     def signed_salt(self, appid, secret, text):
         """Generates salt and sign as used by Chinese services."""
@@ -33,6 +33,7 @@ class DeepLTranslation(MachineTranslation):
     # This seems to be currently best MT service, so score it a bit
     # better than other ones.
     max_score = 91
+    batch_size = 50
 
     def __init__(self):
         """Check configuration."""
@@ -59,3 +60,20 @@ class DeepLTranslation(MachineTranslation):
             (translation['text'], self.max_score, self.name, text)
             for translation in response['translations']
         ]
+
+    def download_batch_translations(self, source, language, texts, units,
+                                    request):
+        """Download translations for several texts in single request."""
+        response = self.json_req(
+            DEEPL_API,
+            http_post=True,
+            auth_key=settings.MT_DEEPL_KEY,
+            text=texts,
+            source_lang=source,
+            target_lang=language,
+        )
+
+        return [
+            [(translation['text'], self.max_score, self.name, text)]
+            for text, translation in zip(texts, response['translations'])
+        ]
@@ -34,6 +34,7 @@ class GoogleTranslation(MachineTranslation):
     """Google Translate API v2 machine translation support."""
     name = 'Google Translate'
     max_score = 90
+    batch_size = 50
 
     # Map old codes used by Google to new ones used by Weblate
     language_map = {
@@ -85,3 +86,26 @@ class GoogleTranslation(MachineTranslation):
         translation = response['data']['translations'][0]['translatedText']
 
         return [(translation, self.max_score, self.name, text)]
+
+    def download_batch_translations(self, source, language, texts, units,
+                                    request):
+        """Download translations for several texts in single request."""
+        response = self.json_req(
+            GOOGLE_API_ROOT,
+            http_post=True,
+            key=settings.MT_GOOGLE_KEY,
+            q=texts,
+            source=source,
+            target=language,
+            format='text',
+        )
+
+        if 'error' in response:
+            raise MachineTranslationError(response['error']['message'])
+
+        return [
+            [(translation['translatedText'], self.max_score, self.name, text)]
+            for text, translation in zip(
+                texts, response['data']['translations']
+            )
+        ]
@@ -19,6 +19,7 @@
 #
 
 from datetime import timedelta
+import json
 
 from django.conf import settings
 from django.utils import timezone
@@ -32,6 +33,7 @@ COGNITIVE_TOKEN = COGNITIVE_BASE_URL + '/issueToken?Subscription-Key={0}'
 
 BASE_URL = 'https://api.microsofttranslator.com/V2/Ajax.svc/'
 TRANSLATE_URL = BASE_URL + 'Translate'
+TRANSLATE_ARRAY_URL = BASE_URL + 'TranslateArray'
 LIST_URL = BASE_URL + 'GetLanguagesForTranslate'
 TOKEN_EXPIRY = timedelta(minutes=9)
 
@@ -39,6 +41,7 @@ TOKEN_EXPIRY = timedelta(minutes=9)
 class MicrosoftCognitiveTranslation(MachineTranslation):
     """Microsoft Cognitive Services Translator API support."""
     name = 'Microsoft Translator'
+    batch_size = 20
 
     language_map = {
         'zh-hant': 'zh-CHT',
@@ -127,3 +130,26 @@ class MicrosoftCognitiveTranslation(MachineTranslation):
         }
         response = self.json_req(TRANSLATE_URL, **args)
         return [(response, self.max_score, self.name, text)]
+
+    def download_batch_translations(self, source, language, texts, units,
+                                    request):
+        """Download translations for several texts in single request."""
+        args = {
+            'texts': json.dumps([text[:5000] for text in texts]),
+            'from': source,
+            'to': language,
+            'options': json.dumps({
+                'ContentType': 'text/plain',
+                'Category': 'general',
+            }),
+        }
+        response = self.json_req(TRANSLATE_ARRAY_URL, http_post=True, **args)
+
+        # We should get a list, string usually means an error
+        if isinstance(response, six.string_types):
+            raise Exception(response)
+
+        return [
+            [(translation['TranslatedText'], self.max_score, self.name, text)]
+            for text, translation in zip(texts, response)
+        ]
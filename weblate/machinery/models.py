@@ -78,6 +78,16 @@ class WeblateConf(AppConf):
     NETEASE_KEY = None
     NETEASE_SECRET = None
 
+    # Timeouts for connecting and reading responses in seconds
+    CONNECT_TIMEOUT = 3
+    READ_TIMEOUT = 5
+
+    # Maximal size of service response in bytes
+    MAX_RESPONSE_SIZE = 1024 * 1024
+
+    # Number of untranslated units to prefetch machine translations for
+    PREFETCH_UNITS = 0
+
     # List of machine translations
     SERVICES = (
         'weblate.machinery.weblatetm.WeblateTranslation',
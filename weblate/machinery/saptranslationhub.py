@@ -24,7 +24,7 @@ import json
 from django.conf import settings
 
 import six
-from six.moves.urllib.request import Request, urlopen
+from six.moves.urllib.request import Request
 
 from weblate import USER_AGENT
 from weblate.utils.site import get_site_url
@@ -105,14 +105,13 @@ class SAPTranslationHub(MachineTranslation):
         request.add_header('User-Agent', USER_AGENT.encode('utf-8'))
         request.add_header('Referer', get_site_url().encode('utf-8'))
         request.add_header('Content-Type', 'application/json; charset=utf-8')
-        request.add_header('Content-Length', len(request_data_as_bytes))
         request.add_header('Accept', 'application/json; charset=utf-8')
         self.authenticate(request)
 
         # Read and possibly convert response
-        content = urlopen(
-            request, request_data_as_bytes, timeout=0.5
-        ).read().decode('utf-8')
+        content = self.http_request(
+            request, request_data_as_bytes
+        ).decode('utf-8')
         # Replace literal \t
         content = content.strip().replace(
             '\t', '\\t'
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2019 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from __future__ import absolute_import, unicode_literals
+
+from django.conf import settings
+
+from weblate.celery import app
+from weblate.machinery import MACHINE_TRANSLATION_SERVICES
+from weblate.machinery.base import MachineTranslationError
+from weblate.utils.state import STATE_TRANSLATED
+
+
+@app.task
+def prefetch_machinery(translation_id, unit_ids=None):
+    """Fill machine translation cache for units of a translation.
+
+    Without unit_ids the first untranslated units are used.
+    """
+    from weblate.trans.models import Unit
+    units = Unit.objects.filter(translation_id=translation_id).prefetch()
+    if unit_ids is None:
+        units = units.filter(
+            state__lt=STATE_TRANSLATED
+        )[:settings.MT_PREFETCH_UNITS]
+        units = list(units)
+    else:
+        lookup = {unit.pk: unit for unit in units.filter(pk__in=unit_ids)}
+        units = [lookup[pk] for pk in unit_ids if pk in lookup]
+
+    if not units:
+        return
+
+    language = units[0].translation.language.code
+    texts = [unit.get_source_plurals()[0] for unit in units]
+
+    for service in MACHINE_TRANSLATION_SERVICES.values():
+        # Only cached results can be used later
+        if not service.cache_translations:
+            continue
+        try:
+            service.translate_batch(language, texts, units, None)
+        except MachineTranslationError:
+            continue
+
+
+def warm_machinery(translation, unit_ids=None):
+    """Schedule prefetching of machine translations if enabled."""
+    if settings.MT_PREFETCH_UNITS and MACHINE_TRANSLATION_SERVICES.exists():
+        prefetch_machinery.delay(translation.pk, unit_ids)
@@ -20,9 +20,14 @@
 
 from __future__ import unicode_literals
 import json
+from multiprocessing.pool import ThreadPool
+import threading
 
 from botocore.stub import Stubber, ANY
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from six.moves.socketserver import ThreadingMixIn
 
+from django.core.cache import cache
 from django.http import HttpRequest
 from django.test import TestCase
 from django.test.utils import override_settings
@@ -34,6 +39,7 @@ from weblate.trans.search import update_fulltext
 from weblate.trans.tests.test_views import FixtureTestCase
 from weblate.trans.tests.utils import get_test_file
 from weblate.trans.models.unit import Unit
+from weblate.machinery import MACHINE_TRANSLATION_SERVICES
 from weblate.machinery.base import MachineTranslationError
 from weblate.machinery.baidu import BaiduTranslation, BAIDU_API
 from weblate.machinery.dummy import DummyTranslation
@@ -52,6 +58,7 @@ from weblate.machinery.yandex import YandexTranslation
 from weblate.machinery.youdao import YoudaoTranslation
 from weblate.machinery.netease import NeteaseSightTranslation, NETEASE_API_ROOT
 from weblate.machinery.saptranslationhub import SAPTranslationHub
+from weblate.machinery.tasks import prefetch_machinery
 from weblate.machinery.weblatetm import WeblateTranslation
 from weblate.checks.tests.test_checks import MockUnit
 from weblate.utils.state import STATE_TRANSLATED
@@ -239,6 +246,13 @@ DEEPL_RESPONSE = b'''{
     ]
 }'''
 
+DEEPL_BATCH_RESPONSE = b'''{
+    "translations": [
+        { "detected_source_language": "EN", "text": "Hallo, Welt" },
+        { "detected_source_language": "EN", "text": "Welt" }
+    ]
+}'''
+
 
 class MachineTranslationTest(TestCase):
     """Testing of machine translation core."""
@@ -391,6 +405,49 @@ class MachineTranslationTest(TestCase):
         self.assert_translate(machine)
         self.assert_translate(machine, word='Zkouška')
 
+    @override_settings(MT_MICROSOFT_COGNITIVE_KEY='KEY')
+    @httpretty.activate
+    def test_microsoft_cognitive_batch(self):
+        def request_callback(request, uri, headers):
+            texts = json.loads(request.parsed_body['texts'][0])
+            return (
+                200,
+                headers,
+                json.dumps(
+                    [{'TranslatedText': text.upper()} for text in texts]
+                )
+            )
+
+        machine = self.get_machine(MicrosoftCognitiveTranslation)
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://api.cognitive.microsoft.com/sts/v1.0/issueToken'
+            '?Subscription-Key=KEY',
+            body='TOKEN'
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://api.microsofttranslator.com/V2/Ajax.svc/'
+            'GetLanguagesForTranslate',
+            body='["en","cs"]'
+        )
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://api.microsofttranslator.com/V2/Ajax.svc/TranslateArray',
+            body=request_callback
+        )
+        results = machine.translate_batch(
+            'cs', ['world', 'hello'], [MockUnit(), MockUnit()], HttpRequest()
+        )
+        self.assertEqual(
+            [result[0]['text'] for result in results], ['WORLD', 'HELLO']
+        )
+        self.assertEqual(
+            [result[0]['source'] for result in results], ['world', 'hello']
+        )
+        # The texts are sent in the request body
+        self.assertEqual(httpretty.last_request().querystring, {})
+
     def register_microsoft_terminology(self):
         with open(TERMINOLOGY_WDSL, 'rb') as handle:
             httpretty.register_uri(
@@ -463,6 +520,42 @@ class MachineTranslationTest(TestCase):
         self.assert_translate(machine, lang='he')
         self.assert_translate(machine, word='Zkouška')
 
+    @override_settings(MT_GOOGLE_KEY='KEY')
+    @httpretty.activate
+    def test_google_batch(self):
+        machine = self.get_machine(GoogleTranslation)
+        httpretty.register_uri(
+            httpretty.GET,
+            GOOGLE_API_ROOT + 'languages',
+            body=json.dumps(
+                {
+                    'data': {
+                        'languages': [{'language': 'en'}, {'language': 'cs'}]
+                    }
+                }
+            )
+        )
+        httpretty.register_uri(
+            httpretty.POST,
+            GOOGLE_API_ROOT,
+            body=json.dumps(
+                {
+                    'data': {
+                        'translations': [
+                            {'translatedText': 'svet'},
+                            {'translatedText': 'ahoj'},
+                        ]
+                    }
+                }
+            )
+        )
+        results = machine.translate_batch(
+            'cs', ['world', 'hello'], [MockUnit(), MockUnit()], HttpRequest()
+        )
+        self.assertEqual(
+            [result[0]['text'] for result in results], ['svet', 'ahoj']
+        )
+
     @override_settings(MT_GOOGLE_KEY='KEY')
     @httpretty.activate
     def test_google_invalid(self):
@@ -549,6 +642,42 @@ class MachineTranslationTest(TestCase):
         self.assert_translate(machine)
         self.assert_translate(machine, word='Zkouška')
 
+    @override_settings(MT_YANDEX_KEY='KEY')
+    @httpretty.activate
+    def test_yandex_batch(self):
+        def request_callback(request, uri, headers):
+            texts = request.parsed_body['text']
+            return (
+                200,
+                headers,
+                json.dumps({
+                    'code': 200,
+                    'lang': 'en-cs',
+                    'text': [text.upper() for text in texts],
+                })
+            )
+
+        machine = self.get_machine(YandexTranslation)
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://translate.yandex.net/api/v1.5/tr.json/getLangs',
+            body=b'{"dirs": ["en-cs"]}'
+        )
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://translate.yandex.net/api/v1.5/tr.json/translate',
+            body=request_callback
+        )
+        results = machine.translate_batch(
+            'cs', ['world', 'hello'], [MockUnit(), MockUnit()], HttpRequest()
+        )
+        self.assertEqual(
+            [result[0]['text'] for result in results], ['WORLD', 'HELLO']
+        )
+        self.assertEqual(
+            [result[0]['source'] for result in results], ['world', 'hello']
+        )
+
     @override_settings(MT_YANDEX_KEY='KEY')
     @httpretty.activate
     def test_yandex_error(self):
@@ -737,6 +866,57 @@ class MachineTranslationTest(TestCase):
         self.assert_translate(machine, lang='de', word='Hello')
         self.assertFalse(httpretty.has_request())
 
+    def test_translate_batch(self):
+        machine = self.get_machine(DummyTranslation)
+        results = machine.translate_batch(
+            'cs',
+            ['Hello, world!', '', 'Hello'],
+            [MockUnit(), MockUnit(), MockUnit()],
+            HttpRequest()
+        )
+        self.assertEqual(len(results), 3)
+        self.assertEqual(len(results[0]), 2)
+        self.assertEqual(results[1], [])
+        self.assertEqual(results[2], [])
+        self.assertEqual(
+            machine.translate_batch('de', ['Hello'], [MockUnit()], None),
+            [[]]
+        )
+
+    @override_settings(MT_DEEPL_KEY='KEY')
+    @httpretty.activate
+    def test_deepl_batch(self):
+        machine = self.get_machine(DeepLTranslation, True)
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://api.deepl.com/v1/translate',
+            body=DEEPL_RESPONSE,
+        )
+        # Fetch single text, stored in the cache
+        self.assert_translate(machine, lang='de', word='Hello')
+        httpretty.reset()
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://api.deepl.com/v1/translate',
+            body=DEEPL_BATCH_RESPONSE,
+        )
+        results = machine.translate_batch(
+            'de',
+            ['Hello', 'Hello, world', 'World'],
+            [MockUnit(), MockUnit(), MockUnit()],
+            HttpRequest()
+        )
+        self.assertEqual(
+            [result[0]['text'] for result in results],
+            ['Hallo', 'Hallo, Welt', 'Welt']
+        )
+        # Only texts not in the cache were requested
+        self.assertEqual(len(httpretty.latest_requests()), 1)
+        self.assertEqual(
+            httpretty.last_request().parsed_body['text'],
+            ['Hello, world', 'World']
+        )
+
     @override_settings(MT_AWS_REGION='us-west-2')
     def test_aws(self):
         machine = self.get_machine(AWSTranslation)
@@ -771,6 +951,102 @@ class MachineTranslationTest(TestCase):
         self.assertFalse(httpretty.has_request())
 
 
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.server.body)))
+        self.end_headers()
+        self.wfile.write(self.server.body)
+
+    def log_message(self, *args):
+        return
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    body = b'{"translation": "svet"}'
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubHandler)
+        self.connections = set()
+
+
+class StubTranslation(DummyTranslation):
+    name = 'Stub'
+
+    def __init__(self, url):
+        super(StubTranslation, self).__init__()
+        self.url = url
+
+    def download_translations(self, source, language, text, unit, request):
+        response = self.json_req(self.url, q=text)
+        return [(response['translation'], 100, self.name, text)]
+
+
+class HTTPSessionTest(TestCase):
+    """Testing of HTTP requests against local server."""
+    def setUp(self):
+        self.server = StubServer()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.machine = StubTranslation(
+            'http://127.0.0.1:{0}/'.format(self.server.server_port)
+        )
+        self.machine.delete_cache()
+        self.machine.cache_translations = False
+
+    def tearDown(self):
+        self.machine.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def translate(self):
+        return self.machine.translate(
+            'cs', 'Hello, world!', MockUnit(), HttpRequest()
+        )
+
+    def test_keepalive(self):
+        self.assertEqual(self.translate()[0]['text'], 'svet')
+        self.assertEqual(self.translate()[0]['text'], 'svet')
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_latency(self):
+        self.translate()
+        self.translate()
+        latency = self.machine.get_latency()
+        self.assertEqual(latency['count'], 2)
+        self.assertEqual(
+            sum(value for key, value in latency.items()
+                if key not in ('count', 'sum')),
+            2
+        )
+
+    def test_concurrent(self):
+        pool = ThreadPool(4)
+        try:
+            results = pool.map(lambda x: self.translate(), range(8))
+        finally:
+            pool.terminate()
+            pool.join()
+        self.assertEqual(
+            [result[0]['text'] for result in results], ['svet'] * 8
+        )
+        # The connections are pooled in the session shared by threads
+        self.assertLessEqual(len(self.server.connections), 4)
+        self.assertEqual(self.machine.get_latency()['count'], 8)
+
+    @override_settings(MT_MAX_RESPONSE_SIZE=10)
+    def test_response_size(self):
+        with self.assertRaises(MachineTranslationError):
+            self.translate()
+
+
 class WeblateTranslationTest(FixtureTestCase):
     def test_empty(self):
         machine = WeblateTranslation()
@@ -814,3 +1090,52 @@ class WeblateTranslationTest(FixtureTestCase):
             request,
         )
         self.assertNotEqual(results, [])
+
+
+class PrefetchTest(FixtureTestCase):
+    def setUp(self):
+        super(PrefetchTest, self).setUp()
+        self.machine = DummyTranslation()
+        self.machine.delete_cache()
+        MACHINE_TRANSLATION_SERVICES['dummy'] = self.machine
+        self.addCleanup(MACHINE_TRANSLATION_SERVICES.data.pop, 'dummy')
+
+    def is_cached(self, unit):
+        return cache.get(
+            self.machine.translate_cache_key(
+                'en', 'cs', unit.get_source_plurals()[0]
+            )
+        ) is not None
+
+    def get_units(self):
+        return list(self.get_translation().unit_set.all())
+
+    @override_settings(MT_PREFETCH_UNITS=2)
+    def test_prefetch(self):
+        cache.clear()
+        prefetch_machinery(self.get_translation().pk)
+        units = self.get_units()
+        self.assertTrue(self.is_cached(units[0]))
+        self.assertTrue(self.is_cached(units[1]))
+        self.assertFalse(self.is_cached(units[2]))
+        # Served from the cache
+        self.assertEqual(
+            self.machine.translate(
+                'cs', 'Hello, world!\n', self.get_unit(), HttpRequest()
+            ),
+            cache.get(
+                self.machine.translate_cache_key(
+                    'en', 'cs', 'Hello, world!\n'
+                )
+            )
+        )
+
+    @override_settings(MT_PREFETCH_UNITS=2)
+    def test_translate_view(self):
+        cache.clear()
+        self.client.get(self.get_translation().get_translate_url())
+        units = self.get_units()
+        self.assertFalse(self.is_cached(units[0]))
+        self.assertTrue(self.is_cached(units[1]))
+        self.assertTrue(self.is_cached(units[2]))
+        self.assertFalse(self.is_cached(units[3]))
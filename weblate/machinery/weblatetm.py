@@ -31,6 +31,8 @@ class WeblateTranslation(MachineTranslation):
     name = 'Weblate'
     rank_boost = 1
     cache_translations = False
+    # Uses the database connection of the calling thread
+    concurrency = 1
 
     def is_supported(self, source, language):
         """Any language is supported."""
@@ -31,6 +31,7 @@ class YandexTranslation(MachineTranslation):
     """Yandex machine translation support."""
     name = 'Yandex'
     max_score = 90
+    batch_size = 50
 
     def __init__(self):
         """Check configuration."""
@@ -78,3 +79,22 @@ class YandexTranslation(MachineTranslation):
             (translation, self.max_score, self.name, text)
             for translation in response['text']
         ]
+
+    def download_batch_translations(self, source, language, texts, units,
+                                    request):
+        """Download translations for several texts in single request."""
+        response = self.json_req(
+            'https://translate.yandex.net/api/v1.5/tr.json/translate',
+            http_post=True,
+            key=settings.MT_YANDEX_KEY,
+            text=texts,
+            lang='{0}-{1}'.format(source, language),
+            target=language,
+        )
+
+        self.check_failure(response)
+
+        return [
+            [(translation, self.max_score, self.name, text)]
+            for text, translation in zip(texts, response['text'])
+        ]
@@ -30,6 +30,8 @@ class WeblateMemory(MachineTranslation):
     name = 'Weblate Translation Memory'
     rank_boost = 2
     cache_translations = False
+    # Uses the database connection of the calling thread
+    concurrency = 1
 
     def convert_language(self, language):
         return Language.objects.get(code=language)
@@ -22,9 +22,10 @@ from __future__ import unicode_literals
 
 import json
 import os.path
+from time import time
 
+from django.core.cache import cache
 from django.utils.encoding import force_text
-from django.utils.functional import cached_property
 from django.utils.translation import pgettext, ugettext as _
 
 from translate.misc.xml_helpers import getXMLlang, getXMLspace
@@ -87,6 +88,8 @@ class TMSchema(SchemaClass):
 class TranslationMemory(WhooshIndex):
     LOCATION = 'memory'
     SCHEMA = TMSchema
+    # Maximal number of fuzzy matches compared with looked up string
+    LOOKUP_LIMIT = 1000
 
     def __init__(self):
         self.index = self.open_index()
@@ -102,24 +105,11 @@ class TranslationMemory(WhooshIndex):
     def __del__(self):
         self.close()
 
-    @cached_property
-    def searcher(self):
-        return self.index.searcher()
-
     def doc_count(self):
         return self.searcher.doc_count()
 
-    def close(self):
-        if 'seacher' in self.__dict__:
-            self.seacher.close()
-            del self.__dict__['searcher']
-
-    def refresh(self):
-        if 'seacher' in self.__dict__:
-            self.__dict__['searcher'] = self.seacher.refresh()
-
     def writer(self):
-        return self.index.writer()
+        return self.open_writer(self.index)
 
     @staticmethod
     def get_language_code(code, langmap):
@@ -280,19 +270,31 @@ class TranslationMemory(WhooshIndex):
             query.Term('target_language', target_language),
             self.get_filter(user, project, use_shared, True),
         ])
+        start = time()
         text_query = self.parser.parse(text)
-        matches = self.searcher.search(
-            text_query, filter=langfilter, limit=20000
-        )
-
-        for match in matches:
-            similarity = self.comparer.similarity(text, match['source'])
-            if similarity < 30:
-                continue
-            yield (
-                match['source'], match['target'], similarity,
-                match['category'], match['origin']
+        with self.use_searcher() as searcher:
+            matches = searcher.search(
+                text_query, filter=langfilter, limit=self.LOOKUP_LIMIT
             )
+            similarities = self.comparer.similarities(
+                text, [match['source'] for match in matches], 30
+            )
+
+            result = [
+                (
+                    match['source'], match['target'], similarity,
+                    match['category'], match['origin']
+                )
+                for match, similarity in zip(matches, similarities)
+                if similarity >= 30
+            ]
+        cache.set('memory-lookup', time() - start, None)
+        return result
+
+    @staticmethod
+    def get_lookup_time():
+        """Return duration of last lookup in seconds."""
+        return cache.get('memory-lookup')
 
     def delete(self, origin=None, category=None, project=None, user=None,
                use_file=False):
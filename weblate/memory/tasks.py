@@ -21,7 +21,6 @@
 from __future__ import absolute_import, unicode_literals
 
 import os.path
-from time import sleep
 
 from celery_batches import Batches
 
@@ -92,7 +91,11 @@ def update_memory_task(self, *args, **kwargs):
                 result[key] = force_text(value)
         return result
 
-    data = extract_batch_kwargs(*args, **kwargs)
+    # Skip duplicate entries within the batch
+    data = list({
+        tuple(sorted(item.items())): item
+        for item in extract_batch_kwargs(*args, **kwargs)
+    }.values())
 
     memory = TranslationMemory()
     try:
@@ -102,7 +105,6 @@ def update_memory_task(self, *args, **kwargs):
     except LockError:
         # Manually handle retries, it doesn't work
         # with celery-batches
-        sleep(10)
         for unit in data:
             update_memory_task.delay(**unit)
 
@@ -20,6 +20,9 @@
 from __future__ import unicode_literals
 
 import json
+import weakref
+
+from celery_batches import SimpleRequest
 
 from django.core.management import call_command
 from django.core.management.base import CommandError
@@ -31,7 +34,9 @@ from six import StringIO
 
 from weblate.memory.machine import WeblateMemory
 from weblate.memory.storage import TranslationMemory, CATEGORY_FILE
+from weblate.memory.tasks import update_memory_task
 from weblate.trans.tests.utils import get_test_file
+from weblate.utils.index import WhooshIndex
 from weblate.trans.tests.test_views import FixtureTestCase
 from weblate.checks.tests.test_checks import MockUnit
 
@@ -160,6 +165,47 @@ class MemoryTest(SimpleTestCase):
         memory = TranslationMemory()
         self.assertEqual(memory.get_values('origin'), ['test'])
 
+    def test_update_batch(self):
+        request = SimpleRequest(
+            'id', 'update_memory_task', [], TEST_DOCUMENT, {}, 'localhost'
+        )
+        update_memory_task([request, request])
+        memory = TranslationMemory()
+        self.assertEqual(memory.doc_count(), 1)
+        self.assertIsNotNone(TranslationMemory.get_commit_time())
+
+    def test_refresh(self):
+        memory = TranslationMemory()
+        self.assertEqual(memory.doc_count(), 0)
+        add_document()
+        self.assertEqual(memory.doc_count(), 0)
+        memory.refresh()
+        self.assertEqual(memory.doc_count(), 1)
+        searcher = memory.searcher
+        memory.refresh()
+        self.assertIs(memory.searcher, searcher)
+
+    def test_open_segments(self):
+        add_document()
+        first = TranslationMemory()
+        second = TranslationMemory()
+        WhooshIndex.OPEN_INSTANCES.extend(
+            [weakref.ref(first), weakref.ref(second)]
+        )
+        self.assertEqual(first.doc_count(), 1)
+        self.assertEqual(second.doc_count(), 1)
+        first.MAX_OPEN_SEGMENTS = second.MAX_OPEN_SEGMENTS = 1
+        with first.use_searcher():
+            second.refresh()
+        self.assertEqual(first.count_segments(), 1)
+        second.refresh()
+        self.assertEqual(first.count_segments(), 0)
+        self.assertEqual(second.count_segments(), 1)
+        self.assertEqual(first.doc_count(), 1)
+        first.refresh()
+        self.assertEqual(first.count_segments(), 1)
+        self.assertEqual(second.count_segments(), 0)
+
 
 class MemoryDBTest(TestCase):
     def setUp(self):
@@ -181,6 +227,7 @@ class MemoryDBTest(TestCase):
                 },
             ]
         )
+        self.assertIsNotNone(TranslationMemory.get_lookup_time())
 
     def test_import_tmx_command(self):
         call_command(
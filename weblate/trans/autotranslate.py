@@ -18,6 +18,8 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+from multiprocessing.pool import ThreadPool
+
 from django.core.exceptions import PermissionDenied
 from django.db import transaction
 
@@ -89,50 +91,74 @@ class AutoTranslate(object):
 
         self.post_process()
 
-    def fetch_mt(self, engines, threshold):
-        """Get the translations"""
-        translations = {}
-
-        for unit in self.get_units().iterator():
-            # a list to store all found translations
-            max_quality = threshold - 1
-            translation = None
-
-            # Run engines with higher maximal score first
-            engines = sorted(
-                engines,
-                key=lambda x: MACHINE_TRANSLATION_SERVICES[x].get_rank(),
-                reverse=True
+    def translate_units(self, service, units):
+        """Fetch machine translations for units from single service.
+
+        Returns list of results in the same order as units. The units are
+        translated in batches of the service batch_size and services allowing
+        concurrent requests are queried from a pool of threads, the units
+        have to be prefetched so that no database access is needed there.
+        """
+        language = self.translation.language.code
+        batches = [
+            units[offset:offset + service.batch_size]
+            for offset in range(0, len(units), service.batch_size)
+        ]
+
+        def translate(batch):
+            return service.translate_batch(
+                language,
+                [unit.get_source_plurals()[0] for unit in batch],
+                batch,
+                self.request
             )
-            for engine in engines:
-                translation_service = MACHINE_TRANSLATION_SERVICES[engine]
-
-                # Skip service if it can not provide better results.
-                # Typically we skip machine translation when we have
-                # a terminology match.
-                if max_quality >= translation_service.max_score:
-                    continue
 
-                result = translation_service.translate(
-                    self.translation.language.code,
-                    unit.get_source_plurals()[0],
-                    unit,
-                    self.request
-                )
+        if service.concurrency <= 1 or len(batches) <= 1:
+            results = [translate(batch) for batch in batches]
+        else:
+            # Load list of supported languages only once
+            service.get_supported_languages(self.request)
+            pool = ThreadPool(min(service.concurrency, len(batches)))
+            try:
+                results = pool.map(translate, batches)
+            finally:
+                pool.terminate()
+                pool.join()
 
-                for item in result:
-                    if item['quality'] > max_quality:
-                        max_quality = item['quality']
-                        translation = item['text']
+        return [result for batch in results for result in batch]
 
-                # Break if we can't get better match
-                if max_quality == 100:
-                    break
+    def fetch_mt(self, engines, threshold):
+        """Get the translations"""
+        units = list(self.get_units().prefetch())
+        max_quality = {unit.pk: threshold - 1 for unit in units}
+        translations = {}
 
-            if translation is None:
+        # Run engines with higher maximal score first
+        engines = sorted(
+            engines,
+            key=lambda x: MACHINE_TRANSLATION_SERVICES[x].get_rank(),
+            reverse=True
+        )
+        for engine in engines:
+            translation_service = MACHINE_TRANSLATION_SERVICES[engine]
+
+            # Skip service if it can not provide better results.
+            # Typically we skip machine translation when we have
+            # a terminology match. Units with exact match are complete.
+            pending = [
+                unit for unit in units
+                if max_quality[unit.pk] < translation_service.max_score and
+                max_quality[unit.pk] != 100
+            ]
+            if not pending:
                 continue
 
-            translations[unit.pk] = translation
+            results = self.translate_units(translation_service, pending)
+            for unit, result in zip(pending, results):
+                for item in result:
+                    if item['quality'] > max_quality[unit.pk]:
+                        max_quality[unit.pk] = item['quality']
+                        translations[unit.pk] = item['text']
 
         return translations
 
@@ -18,10 +18,14 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+from django.core.management.base import CommandError
+
 from weblate.trans.management.commands import WeblateComponentCommand
 from weblate.lang.models import Language
 from weblate.trans.models import Unit
-from weblate.trans.search import Fulltext
+from weblate.trans.search import (
+    Fulltext, SourceSchema, TargetSchema, get_fulltext,
+)
 from weblate.trans.tasks import optimize_fulltext
 
 
@@ -48,6 +52,7 @@ class Command(WeblateComponentCommand):
     def process_filtered(self, fulltext, **options):
         # Open writer
         source_writer = fulltext.get_source_index().writer()
+        fulltext.add_missing_fields(source_writer, SourceSchema)
         source_searcher = source_writer.searcher()
         target_writers = {}
         target_searchers = {}
@@ -61,6 +66,9 @@ class Command(WeblateComponentCommand):
                     target_writers[lang] = fulltext.get_target_index(
                         lang
                     ).writer()
+                    fulltext.add_missing_fields(
+                        target_writers[lang], TargetSchema
+                    )
                     target_searchers[lang] = target_writers[lang].searcher()
                 # Update target index
                 if unit.translation:
@@ -94,7 +102,7 @@ class Command(WeblateComponentCommand):
                         with writer.searcher() as searcher:
                             units = Unit.objects.filter(
                                 translation__language=language
-                            )
+                            ).select_related('translation__language')
                             for unit in units.iterator():
                                 if unit.translation:
                                     fulltext.update_target_unit_index(
@@ -110,7 +118,9 @@ class Command(WeblateComponentCommand):
         if options['optimize']:
             optimize_fulltext()
             return
-        fulltext = Fulltext()
+        fulltext = get_fulltext()
+        if not isinstance(fulltext, Fulltext):
+            raise CommandError('Configured search backend uses no index!')
         # Optionally rebuild indices from scratch
         if options['clean'] or options['all']:
             fulltext.cleanup()
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 2.1.15 on 2019-02-21 09:41
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+FIELDS = ('source', 'context', 'location', 'target', 'comment')
+
+
+def create_index(apps, schema_editor):
+    """Create indices used by PostgreSQL fulltext search."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for field in FIELDS:
+        schema_editor.execute(
+            'CREATE INDEX trans_unit_{0}_fulltext ON trans_unit '
+            'USING GIN (to_tsvector(\'simple\', {0}))'.format(field)
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for field in FIELDS:
+        schema_editor.execute(
+            'DROP INDEX trans_unit_{0}_fulltext'.format(field)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trans', '0015_linked_component_branch'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index, elidable=False),
+    ]
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 2.1.15 on 2019-02-22 10:12
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+from weblate.utils.db import bulk_update
+from weblate.utils.hash import calculate_hash
+
+
+def fill_source_hash(apps, schema_editor):
+    """Calculate source hash for existing units."""
+    Unit = apps.get_model('trans', 'Unit')
+    units = []
+    for unit in Unit.objects.only('source').iterator():
+        unit.source_hash = calculate_hash(unit.source, '')
+        units.append(unit)
+        if len(units) >= 1000:
+            bulk_update(Unit.objects.all(), units, ['source_hash'])
+            units = []
+    bulk_update(Unit.objects.all(), units, ['source_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trans', '0016_unit_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unit',
+            name='source_hash',
+            field=models.BigIntegerField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name='unit',
+            name='id_hash',
+            field=models.BigIntegerField(db_index=True),
+        ),
+        migrations.RunPython(
+            fill_source_hash, migrations.RunPython.noop, elidable=True
+        ),
+    ]
@@ -105,7 +105,6 @@ def update_comment_flag(sender, instance, **kwargs):
     for unit in instance.related_units:
         # Update unit stats
         unit.update_has_comment()
-        unit.translation.invalidate_cache()
 
 
 @receiver(post_delete, sender=Suggestion)
@@ -116,7 +115,15 @@ def update_suggestion_flag(sender, instance, **kwargs):
     for unit in instance.related_units:
         # Update unit stats
         unit.update_has_suggestion()
-        unit.translation.invalidate_cache()
+
+
+@receiver(post_delete, sender=Dictionary)
+@receiver(post_save, sender=Dictionary)
+def update_dictionary_index(sender, instance, **kwargs):
+    """Invalidate in memory dictionary index."""
+    Dictionary.objects.invalidate_index(
+        instance.project_id, instance.language_id
+    )
 
 
 @receiver(user_pre_delete)
@@ -181,8 +188,10 @@ def post_save_update_checks(sender, instance, **kwargs):
 def update_checks(pk):
     component = Component.objects.get(pk=pk)
     for translation in component.translation_set.all():
-        for unit in translation.unit_set.all():
-            unit.run_checks()
+        Unit.run_checks_bulk(
+            translation,
+            [(unit, True, True, False) for unit in translation.unit_set.all()]
+        )
     for source in component.source_set.all():
         source.run_checks()
     for translation in component.translation_set.all():
@@ -19,9 +19,13 @@
 #
 from __future__ import unicode_literals
 
+from datetime import datetime, time
+
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 from django.utils.encoding import python_2_unicode_compatible, force_text
 from django.utils.translation import ugettext as _, ugettext_lazy
@@ -32,6 +36,11 @@ from weblate.trans.mixins import UserDisplayMixin
 from weblate.trans.models.project import Project
 from weblate.utils.fields import JSONField
 
+# Number of days for which activity is counted
+ROLLUP_DAYS = 366
+# Time for which changes are counted again to include ones committed late
+ROLLUP_MARGIN = timezone.timedelta(minutes=15)
+
 
 class ChangeQuerySet(models.QuerySet):
     # pylint: disable=no-init
@@ -47,38 +56,79 @@ class ChangeQuerySet(models.QuerySet):
         )
 
     @staticmethod
-    def count_stats(days, step, dtstart, base):
-        """Count number of changes in given dataset and period grouped by
-        step days.
-        """
+    def count_stats(days, step, counts):
+        """Count number of changes in given period grouped by step days.
 
-        # Count number of changes
+        The counts is dictionary of daily counts as returned by get_rollup.
+        """
+        dtstart = timezone.localdate() - timezone.timedelta(days=days - 1)
         result = []
-        for dummy in six.moves.range(0, days, step):
-            # Calculate interval
-            int_start = dtstart
-            int_end = int_start + timezone.timedelta(days=step)
-
-            # Count changes
-            int_base = base.filter(timestamp__range=(int_start, int_end))
-            count = int_base.aggregate(Count('id'))
+        for offset in six.moves.range(0, days, step):
+            int_start = dtstart + timezone.timedelta(days=offset)
+            count = sum(
+                counts.get(int_start + timezone.timedelta(days=day), 0)
+                for day in six.moves.range(step)
+            )
+            result.append((int_start, count))
+        return result
 
-            # Append to result
-            result.append((int_start, count['id__count']))
+    def get_rollup(self, key):
+        """Return daily counts of changes in the queryset.
 
-            # Advance to next interval
-            dtstart = int_end
+        The counts are kept in the cache and only changes added since the
+        last call are counted. The rollup is calculated from scratch every
+        day to drop old and deleted changes.
 
-        return result
+        Changes are committed out of order, so the ones within
+        ROLLUP_MARGIN are counted again on next call, skipping the already
+        counted ones. Changes showing up later than that are counted on the
+        next day.
+        """
+        today = timezone.localdate()
+        rollup = cache.get(key)
+        if rollup is None or rollup['date'] != today:
+            rollup = {
+                'date': today,
+                'edge': timezone.make_aware(datetime.combine(
+                    today - timezone.timedelta(days=ROLLUP_DAYS), time()
+                )),
+                'seen': set(),
+                'days': {},
+            }
+        cutoff = max(timezone.now() - ROLLUP_MARGIN, rollup['edge'])
+        base = self.filter(timestamp__gte=rollup['edge']).order_by()
+        # Older changes are counted at once
+        stats = base.filter(
+            timestamp__lt=cutoff
+        ).exclude(
+            pk__in=rollup['seen']
+        ).annotate(
+            day=TruncDate('timestamp')
+        ).values('day').annotate(
+            count=Count('id')
+        ).values_list('day', 'count')
+        for day, count in stats:
+            rollup['days'][day] = rollup['days'].get(day, 0) + count
+        # Changes within margin are remembered to count them only once
+        seen = set()
+        recent = base.filter(timestamp__gte=cutoff).values_list(
+            'pk', 'timestamp'
+        )
+        for pk, timestamp in recent:
+            seen.add(pk)
+            if pk not in rollup['seen']:
+                day = timezone.localtime(timestamp).date()
+                rollup['days'][day] = rollup['days'].get(day, 0) + 1
+        rollup['edge'] = cutoff
+        rollup['seen'] = seen
+        cache.set(key, rollup, 24 * 3600)
+        return rollup['days']
 
     def base_stats(self, days, step,
                    project=None, component=None, translation=None,
                    language=None, user=None):
         """Core of daily/weekly/monthly stats calculation."""
 
-        # Get range (actually start)
-        dtstart = timezone.now() - timezone.timedelta(days=days + 1)
-
         # Base for filtering
         base = self.all()
 
@@ -98,7 +148,12 @@ class ChangeQuerySet(models.QuerySet):
         if user is not None:
             base = base.filter(user=user)
 
-        return self.count_stats(days, step, dtstart, base)
+        key = 'activity-rollup-{}'.format('-'.join(
+            str(obj.pk) if obj is not None else '0'
+            for obj in (project, component, translation, language, user)
+        ))
+
+        return self.count_stats(days, step, base.get_rollup(key))
 
     def prefetch(self):
         """Fetch related fields in a big chungs to avoid loading them
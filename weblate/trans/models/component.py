@@ -29,6 +29,7 @@ import re
 
 from django.conf import settings
 from django.db import models, transaction
+from django.db.models import Exists, OuterRef, Q
 from django.utils.translation import ugettext as _, ugettext_lazy
 from django.utils.encoding import python_2_unicode_compatible, force_text
 from django.utils.functional import cached_property
@@ -43,6 +44,7 @@ from six.moves.urllib.parse import urlparse
 from weblate.checks import CHECKS
 from weblate.checks.models import Check
 from weblate.formats.models import FILE_FORMATS
+from weblate.formats.parallel import can_parse_parallel, parse_parallel
 from weblate.trans.mixins import URLMixin, PathMixin
 from weblate.trans.fields import RegexField
 from weblate.utils import messages
@@ -65,7 +67,7 @@ from weblate.vcs.ssh import add_host_key
 from weblate.utils.stats import ComponentStats
 from weblate.trans.exceptions import FileParseError
 from weblate.trans.models.alert import ALERTS_IMPORT
-from weblate.trans.models.translation import Translation
+from weblate.trans.models.translation import Translation, BULK_BATCH_SIZE
 from weblate.trans.validators import (
     validate_filemask, validate_autoaccept, validate_check_flags,
 )
@@ -1107,8 +1109,10 @@ class Component(models.Model, URLMixin, PathMixin):
             )
             raise
         matches = self.get_mask_matches()
+        parsed_paths, parsed = self.parse_translations(matches, force, langs)
         for pos, path in enumerate(matches):
             with transaction.atomic():
+                store = next(parsed) if path in parsed_paths else None
                 code = self.get_lang_code(path)
                 if langs is not None and code not in langs:
                     self.log_info('skipping %s', path)
@@ -1139,7 +1143,8 @@ class Component(models.Model, URLMixin, PathMixin):
                     )
                     continue
                 translation = Translation.objects.check_sync(
-                    self, lang, code, path, force, request=request
+                    self, lang, code, path, force, request=request,
+                    store=store
                 )
                 translations[translation.id] = translation
                 languages[lang.code] = code
@@ -1189,6 +1194,7 @@ class Component(models.Model, URLMixin, PathMixin):
             cleanup_project.delay(self.project.pk)
 
         from weblate.accounts.notifications import notify_new_string
+        from weblate.machinery.tasks import warm_machinery
         # First invalidate all caches
         for translation in translations.values():
             translation.invalidate_cache()
@@ -1197,9 +1203,47 @@ class Component(models.Model, URLMixin, PathMixin):
         for translation in translations.values():
             if translation.notify_new_string:
                 notify_new_string(translation)
+                warm_machinery(translation)
 
         self.log_info('updating completed')
 
+    def parse_translations(self, matches, force=False, langs=None):
+        """Parse translation files in worker processes.
+
+        This is used only when enabled by PARSE_PROCESSES and only for files
+        which will be certainly loaded, that is new ones or all on forced
+        reload.
+
+        Returns set of parsed paths and iterator over parsed stores in the
+        same order as they are in matches.
+        """
+        processes = settings.PARSE_PROCESSES
+        if processes < 2 or not can_parse_parallel():
+            return set(), iter(())
+        if force:
+            existing = set()
+        else:
+            existing = set(
+                self.translation_set.values_list('filename', flat=True)
+            )
+        paths = [
+            path for path in matches
+            if path not in existing and
+            (langs is None or self.get_lang_code(path) in langs)
+        ]
+        if len(paths) < 2:
+            return set(), iter(())
+        self.log_info(
+            'parsing %d files using %d processes', len(paths), processes
+        )
+        jobs = [
+            (os.path.join(self.full_path, path), self.get_lang_code(path))
+            for path in paths
+        ]
+        return set(paths), parse_parallel(
+            self.file_format_cls, self.template_store, jobs, processes
+        )
+
     def get_lang_code(self, path):
         """Parse language code from path."""
         # Parse filename
@@ -1733,50 +1777,83 @@ class Component(models.Model, URLMixin, PathMixin):
     def run_target_checks(self):
         """Run batch executed target checks"""
         from weblate.trans.models import Unit
-        have_check = set()
-        need_update = set()
+        changed = False
         for check, check_obj in CHECKS.items():
             if not check_obj.target or not check_obj.batch_update:
                 continue
             self.log_info('running batch check: %s', check)
+            checks = Check.objects.filter(project=self.project, check=check)
             # List of triggered checks
-            data = check_obj.check_target_project(self.project)
+            data = {
+                (item['content_hash'], item['translation__language'])
+                for item in check_obj.check_target_project(self.project)
+            }
             # Fetch existing check instances
-            existing = set(
-                Check.objects.filter(
-                    project=self.project,
-                    check=check
-                ).values_list(
-                    'pk', flat=True
+            existing = {
+                (content_hash, language): pk
+                for pk, content_hash, language in checks.values_list(
+                    'pk', 'content_hash', 'language_id'
                 )
-            )
+            }
             # Create new check instances
-            for item in data:
-                instance = Check.objects.get_or_create(
-                    content_hash=item['content_hash'],
-                    project=self.project,
-                    language_id=item['translation__language'],
-                    check=check,
-                    defaults={'ignore': False},
-                )[0]
-                have_check.add((
-                    item['content_hash'], item['translation__language']
-                ))
-                existing.discard(instance.pk)
+            Check.objects.bulk_create(
+                [
+                    Check(
+                        content_hash=content_hash,
+                        project=self.project,
+                        language_id=language,
+                        check=check,
+                        ignore=False,
+                    )
+                    for content_hash, language in data - set(existing)
+                ],
+                batch_size=BULK_BATCH_SIZE
+            )
             # Remove stale instances
-            todelete = Check.objects.filter(pk__in=existing)
-            need_update.update(todelete.values_list('content_hash', 'language_id'))
-            todelete.delete()
-        # Update has_failing_check flag
-        allunits = Unit.objects.filter(
-            translation__component__project=self.project
+            stale = [
+                pk for key, pk in existing.items() if key not in data
+            ]
+            if stale:
+                checks.filter(pk__in=stale).delete()
+            # Update has_failing_check flag on units with triggered check
+            failing = Unit.objects.filter(
+                translation__component__project=self.project,
+                has_failing_check=False,
+                state__gte=STATE_TRANSLATED,
+            ).annotate(
+                failing=Exists(checks.filter(
+                    ignore=False,
+                    content_hash=OuterRef('content_hash'),
+                    language=OuterRef('translation__language'),
+                ))
+            ).filter(
+                failing=True
+            )
+            if data and failing.update(has_failing_check=True):
+                changed = True
+            changed = changed or bool(stale)
+
+        if not changed:
+            return
+
+        # Update has_failing_check flag on units without any active checks,
+        # only translated units can have failing checks
+        Unit.objects.filter(
+            translation__component__project=self.project,
+            has_failing_check=True,
+        ).annotate(
+            failing=Exists(Check.objects.filter(
+                project=self.project,
+                ignore=False,
+                content_hash=OuterRef('content_hash'),
+                language=OuterRef('translation__language'),
+            ))
+        ).filter(
+            Q(failing=False) | Q(state__lt=STATE_TRANSLATED)
+        ).update(
+            has_failing_check=False
         )
-        if have_check:
-            allunits.data_filter(have_check).update(has_failing_check=True)
-            self.project.stats.invalidate()
-        if need_update:
-            for unit in allunits.data_filter(need_update):
-                unit.update_has_failing_check()
+        self.project.stats.invalidate()
 
     @cached_property
     def osi_approved_license(self):
@@ -49,6 +49,10 @@ class WeblateConf(AppConf):
     # Enable remote hooks
     ENABLE_HOOKS = True
 
+    # Seconds for which repository updates triggered by hooks are delayed
+    # to coalesce repeated notifications
+    HOOK_UPDATE_WINDOW = 30
+
     # Enable sharing
     ENABLE_SHARING = True
 
@@ -64,6 +68,16 @@ class WeblateConf(AppConf):
     # Automatically update vcs repositories daily
     AUTO_UPDATE = False
 
+    # Number of parallel remote updates against single host
+    UPDATE_REMOTES_CONCURRENCY = 4
+
+    # Number of processes used to parse translation files on reload,
+    # parallel parsing is disabled with 0
+    PARSE_PROCESSES = 0
+
+    # Fulltext search backend
+    SEARCH_BACKEND = 'weblate.trans.search.Fulltext'
+
     # List of automatic fixups
     AUTOFIX_LIST = (
         'weblate.trans.autofixes.whitespace.SameBookendingWhitespace',
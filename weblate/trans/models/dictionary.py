@@ -20,9 +20,10 @@
 
 from __future__ import unicode_literals
 
-from itertools import islice
 import re
+from uuid import uuid4
 
+from django.core.cache import cache
 from django.urls import reverse
 from django.db import models
 from django.utils.encoding import python_2_unicode_compatible
@@ -33,11 +34,20 @@ from weblate.lang.models import Language
 from weblate.checks.same import strip_string
 from weblate.formats.auto import AutoFormat
 from weblate.trans.models.project import Project
-from weblate.utils.db import re_escape
 from weblate.utils.errors import report_error
 
 
 SPLIT_RE = re.compile(r'[\s,.:!?]+', re.UNICODE)
+WHITESPACE_RE = re.compile(r'[ \t\n\r\f\v]+')
+
+# Maximal number of dictionary indexes kept in memory
+INDEX_SIZE = 100
+
+# In memory dictionary indexes, see DictionaryManager.get_index
+INDEXES = {}
+
+# Analyzers for source languages, see DictionaryManager.get_analyzers
+ANALYZERS = {}
 
 
 class DictionaryManager(models.Manager):
@@ -114,22 +124,68 @@ class DictionaryManager(models.Manager):
         )
         return created
 
+    @staticmethod
+    def get_analyzers(language):
+        """Return list of analyzers for extracting words in language."""
+        key = (language.base_code, language.uses_ngram())
+        if key not in ANALYZERS:
+            # Prepare analyzers
+            # - simple analyzer just splits words based on regexp
+            # - language analyzer if available (it is for English)
+            analyzers = [
+                SimpleAnalyzer(expression=SPLIT_RE, gaps=True),
+                LanguageAnalyzer(language.base_code),
+            ]
+
+            # Add ngram analyzer for languages like Chinese or Japanese
+            if language.uses_ngram():
+                analyzers.append(NgramAnalyzer(4))
+
+            ANALYZERS[key] = analyzers
+        return ANALYZERS[key]
+
+    @staticmethod
+    def get_index_key(project_id, language_id):
+        return 'dictionary-index-{}-{}'.format(project_id, language_id)
+
+    def invalidate_index(self, project_id, language_id):
+        """Invalidate dictionary indexes in all processes."""
+        cache.delete(self.get_index_key(project_id, language_id))
+
+    def get_index(self, project, language):
+        """Return index of dictionary for project and language.
+
+        The index maps lower case words to ids of entries containing them.
+        It is kept in memory and rebuilt when version stored in the cache
+        changes, see invalidate_index.
+        """
+        key = self.get_index_key(project.pk, language.pk)
+        version = cache.get(key)
+        if version is None:
+            version = uuid4().hex
+            cache.set(key, version, None)
+        elif key in INDEXES and INDEXES[key][0] == version:
+            return INDEXES[key][1]
+
+        index = {}
+        entries = self.filter(
+            project=project, language=language
+        ).values_list('pk', 'source')
+        for pk, source in entries.iterator():
+            for word in WHITESPACE_RE.split(source.lower()):
+                if word:
+                    index.setdefault(word, set()).add(pk)
+
+        if len(INDEXES) >= INDEX_SIZE:
+            INDEXES.clear()
+        INDEXES[key] = (version, index)
+        return index
+
     def get_words(self, unit):
         """Return list of word pairs for an unit."""
         words = set()
-        source_language = unit.translation.component.project.source_language
-
-        # Prepare analyzers
-        # - simple analyzer just splits words based on regexp
-        # - language analyzer if available (it is for English)
-        analyzers = [
-            SimpleAnalyzer(expression=SPLIT_RE, gaps=True),
-            LanguageAnalyzer(source_language.base_code),
-        ]
-
-        # Add ngram analyzer for languages like Chinese or Japanese
-        if source_language.uses_ngram():
-            analyzers.append(NgramAnalyzer(4))
+        project = unit.translation.component.project
+        analyzers = self.get_analyzers(project.source_language)
 
         # Extract words from all plurals and from context
         flags = unit.all_flags
@@ -148,21 +204,23 @@ class DictionaryManager(models.Manager):
             if len(words) > 1000:
                 break
 
-        if '' in words:
-            words.remove('')
-
         if not words:
             # No extracted words, no dictionary
             return self.none()
 
-        # Build the query for fetching the words
-        # We want case insensitive lookup
+        # Find entries containing any of the words
+        index = self.get_index(project, unit.translation.language)
+        matches = set()
+        for word in words:
+            matches.update(index.get(word, ()))
+
+        if not matches:
+            return self.none()
+
         return self.filter(
-            project=unit.translation.component.project,
+            project=project,
             language=unit.translation.language,
-            source__iregex=r'(^|[ \t\n\r\f\v])({0})($|[ \t\n\r\f\v])'.format(
-                '|'.join([re_escape(word) for word in islice(words, 1000)])
-            )
+            pk__in=matches
         )
 
 
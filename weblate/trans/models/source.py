@@ -27,6 +27,7 @@ from django.utils.encoding import python_2_unicode_compatible
 from django.utils.functional import cached_property
 
 from weblate.checks import CHECKS
+from weblate.checks.analysis import process_time, record_check_time
 from weblate.checks.models import Check
 from weblate.trans.validators import validate_check_flags
 from weblate.trans.util import PRIORITY_CHOICES
@@ -129,7 +130,12 @@ class Source(models.Model):
 
         # Run all source checks
         for check, check_obj in CHECKS.items():
-            if check_obj.source and check_obj.check_source(src, unit):
+            if not check_obj.source:
+                continue
+            start = process_time()
+            failing = check_obj.check_source(src, unit)
+            record_check_time(check, process_time() - start)
+            if failing:
                 if check in old_checks:
                     # We already have this check
                     old_checks.remove(check)
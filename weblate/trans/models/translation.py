@@ -38,6 +38,7 @@ from weblate.checks import CHECKS
 from weblate.trans.models.unit import (
     Unit, STATE_TRANSLATED, STATE_FUZZY, STATE_APPROVED,
 )
+from weblate.utils.db import bulk_update
 from weblate.utils.stats import TranslationStats
 from weblate.utils.render import render_template
 from weblate.trans.models.suggestion import Suggestion
@@ -52,10 +53,20 @@ from weblate.trans.mixins import URLMixin, LoggerMixin
 from weblate.trans.models.change import Change
 from weblate.trans.checklists import TranslationChecklist
 
+# Number of objects stored in single query on bulk operations
+BULK_BATCH_SIZE = 1000
+
+# Unit fields updated by check_sync
+SYNC_FIELDS = (
+    'position', 'location', 'flags', 'source', 'target', 'state', 'context',
+    'comment', 'content_hash', 'previous_source', 'priority', 'num_words',
+    'source_hash',
+)
+
 
 class TranslationManager(models.Manager):
     def check_sync(self, component, lang, code, path, force=False,
-                   request=None):
+                   request=None, store=None):
         """Parse translation meta info and updates translation object"""
         translation = self.get_or_create(
             language=lang,
@@ -74,7 +85,7 @@ class TranslationManager(models.Manager):
             translation.filename = path
             translation.language_code = code
             translation.save(update_fields=['filename', 'language_code'])
-        translation.check_sync(force, request=request)
+        translation.check_sync(force, request=request, store=store)
 
         return translation
 
@@ -225,8 +236,12 @@ class Translation(models.Model, URLMixin, LoggerMixin):
         except Exception as exc:
             self.component.handle_parse_error(exc, self)
 
-    def check_sync(self, force=False, request=None, change=None):
-        """Check whether database is in sync with git and possibly updates"""
+    def check_sync(self, force=False, request=None, change=None, store=None):
+        """Check whether database is in sync with git and possibly updates
+
+        The store can be already parsed file (or exception raised while
+        parsing it), otherwise the file is loaded.
+        """
 
         if change is None:
             change = Change.ACTION_UPDATE
@@ -253,7 +268,10 @@ class Translation(models.Model, URLMixin, LoggerMixin):
         created = {}
 
         try:
-            store = self.store
+            if store is None:
+                store = self.store
+            elif isinstance(store, Exception):
+                self.component.handle_parse_error(store, self)
         except FileParseError as error:
             self.log_warning('skipping update due to parse error: %s', error)
             return
@@ -274,6 +292,12 @@ class Translation(models.Model, URLMixin, LoggerMixin):
             unit.id_hash: unit for unit in self.unit_set.select_for_update()
         }
 
+        # Units to store in bulk
+        sync_create = []
+        sync_update = []
+        # Duplicate strings, these are processed once units are stored
+        duplicates = []
+
         for unit in store.all_units:
             if not unit.is_translatable():
                 continue
@@ -291,18 +315,7 @@ class Translation(models.Model, URLMixin, LoggerMixin):
                     newunit,
                     repr(newunit.source)
                 )
-                Change.objects.create(
-                    unit=newunit,
-                    action=Change.ACTION_DUPLICATE_STRING,
-                    user=user,
-                    author=user
-                )
-                self.component.trigger_alert(
-                    'DuplicateString',
-                    language_code=self.language.code,
-                    source=newunit.source,
-                    unit_pk=newunit.pk,
-                )
+                duplicates.append(newunit)
                 continue
 
             try:
@@ -318,7 +331,12 @@ class Translation(models.Model, URLMixin, LoggerMixin):
                 )
                 is_new = True
 
-            newunit.update_from_unit(unit, pos, is_new)
+            sync = newunit.sync_from_unit(unit, pos, is_new)
+            if sync is not None:
+                if is_new:
+                    sync_create.append((newunit, sync))
+                else:
+                    sync_update.append((newunit, sync))
 
             # Check if unit is worth notification:
             # - new and untranslated
@@ -335,6 +353,22 @@ class Translation(models.Model, URLMixin, LoggerMixin):
             # Store current unit ID
             created[id_hash] = newunit
 
+        self.store_units(sync_create, sync_update)
+
+        for newunit in duplicates:
+            Change.objects.create(
+                unit=newunit,
+                action=Change.ACTION_DUPLICATE_STRING,
+                user=user,
+                author=user
+            )
+            self.component.trigger_alert(
+                'DuplicateString',
+                language_code=self.language.code,
+                source=newunit.source,
+                unit_pk=newunit.pk,
+            )
+
         # Following query can get huge, so we should find better way
         # to delete stale units, probably sort of garbage collection
 
@@ -358,6 +392,67 @@ class Translation(models.Model, URLMixin, LoggerMixin):
         # Notify subscribed users
         self.notify_new_string = was_new
 
+    def store_units(self, sync_create, sync_update):
+        """Store units loaded by check_sync in bulk.
+
+        Both arguments are lists of (unit, sync) tuples as returned by
+        Unit.sync_from_unit. The checks, fulltext and signals processing is
+        done once all units are stored, checks are updated in bulk.
+        """
+        if not sync_create and not sync_update:
+            return
+
+        for unit, sync in sync_create + sync_update:
+            unit.update_num_words(sync['same_content'])
+            unit.update_source_hash(sync['same_content'])
+
+        if sync_create:
+            Unit.objects.bulk_create(
+                [unit for unit, sync in sync_create],
+                batch_size=BULK_BATCH_SIZE
+            )
+            # Primary keys are set by bulk_create only on PostgreSQL
+            pks = dict(self.unit_set.values_list('id_hash', 'pk'))
+            for unit, sync in sync_create:
+                unit.pk = pks[unit.id_hash]
+                unit._state.adding = False
+                unit._state.db = self._state.db
+
+        bulk_update(
+            self.unit_set,
+            [unit for unit, sync in sync_update],
+            SYNC_FIELDS,
+            batch_size=BULK_BATCH_SIZE
+        )
+
+        # Create change objects for new source strings, bulk_create skips
+        # Change.save and post_save, this is fine as get_source_change fills
+        # in all relations and the post_save handler ignores this action
+        Change.objects.bulk_create(
+            [
+                unit.get_source_change()
+                for unit, sync in sync_create + sync_update
+                if sync['source_created']
+            ],
+            batch_size=BULK_BATCH_SIZE
+        )
+
+        for unit, sync in sync_create + sync_update:
+            unit.post_sync(sync)
+
+        Unit.run_checks_bulk(
+            self,
+            [
+                (
+                    unit, sync['same_state'], sync['same_content'],
+                    sync['created']
+                )
+                for unit, sync in sync_create + sync_update
+                if not sync['same_content'] or not sync['same_state']
+            ],
+            batch_size=BULK_BATCH_SIZE
+        )
+
     def get_last_remote_commit(self):
         return self.component.get_last_remote_commit()
 
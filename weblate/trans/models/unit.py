@@ -20,6 +20,7 @@
 
 from __future__ import unicode_literals
 
+from collections import defaultdict
 from copy import copy
 import functools
 import re
@@ -27,6 +28,7 @@ import re
 from django.conf import settings
 from django.db import models, transaction
 from django.db.models import Q
+from django.db.models.signals import post_save
 from django.utils import timezone
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.functional import cached_property
@@ -35,15 +37,17 @@ from django.utils.translation import ugettext as _
 import six
 
 from weblate.checks import CHECKS
+from weblate.checks.analysis import process_time, record_check_time
 from weblate.checks.models import Check
 from weblate.memory.tasks import update_memory
 from weblate.trans.models.source import Source
 from weblate.trans.models.comment import Comment
 from weblate.trans.models.suggestion import Suggestion
 from weblate.trans.models.change import Change
-from weblate.trans.search import Fulltext
+from weblate.trans.search import get_fulltext
 from weblate.trans.signals import unit_pre_create
 from weblate.trans.mixins import LoggerMixin
+from weblate.utils.db import bulk_update
 from weblate.utils.errors import report_error
 from weblate.trans.util import (
     is_plural, split_plural, join_plural, get_distinct_translations,
@@ -228,27 +232,56 @@ class UnitQuerySet(models.QuerySet):
 
             result = base.filter(query)
         else:
-            langs = set(self.values_list(
-                'translation__language__code', flat=True
-            ))
-            result = base.filter(
-                pk__in=Fulltext().search(
-                    params['q'],
-                    langs,
-                    params
-                )
+            result = get_fulltext().filter_units(
+                base,
+                params['q'],
+                params,
+                self.get_search_languages(
+                    params, project, component, language
+                ),
+                self.get_search_components(project, component),
             )
         return result
 
+    @staticmethod
+    def get_search_languages(params, project, component, language):
+        """Return language codes within the search scope.
+
+        Returns None if the scope is not limited.
+        """
+        if language is not None:
+            return [language.code]
+        if params.get('lang'):
+            return params['lang']
+        if component is not None:
+            return component.translation_set.values_list(
+                'language__code', flat=True
+            )
+        if project is not None:
+            return project.languages.values_list('code', flat=True)
+        return None
+
+    @staticmethod
+    def get_search_components(project, component):
+        """Return component IDs within the search scope.
+
+        Returns None if the scope is not limited.
+        """
+        if component is not None:
+            return [component.pk]
+        if project is not None:
+            return list(project.component_set.values_list('pk', flat=True))
+        return None
+
     def more_like_this(self, unit, top=5):
         """Find closely similar units."""
-        more_results = Fulltext().more_like(unit.pk, unit.source, top)
-
-        return self.filter(
-            pk__in=more_results,
+        queryset = self.filter(
             translation__language=unit.translation.language,
             state__gte=STATE_TRANSLATED,
         )
+        return queryset.filter(
+            pk__in=get_fulltext().more_like(unit, queryset, top)
+        )
 
     def same(self, unit, exclude=True):
         """Unit with same source within same project."""
@@ -304,8 +337,9 @@ class Unit(models.Model, LoggerMixin):
     translation = models.ForeignKey(
         'Translation', on_delete=models.deletion.CASCADE
     )
-    id_hash = models.BigIntegerField()
+    id_hash = models.BigIntegerField(db_index=True)
     content_hash = models.BigIntegerField(db_index=True)
+    source_hash = models.BigIntegerField(default=0, db_index=True)
     location = models.TextField(default='', blank=True)
     context = models.TextField(default='', blank=True)
     comment = models.TextField(default='', blank=True)
@@ -396,8 +430,13 @@ class Unit(models.Model, LoggerMixin):
             return STATE_APPROVED
         return STATE_TRANSLATED
 
-    def update_from_unit(self, unit, pos, created):
-        """Update Unit from ttkit unit."""
+    def sync_from_unit(self, unit, pos, created):
+        """Load attributes from ttkit unit without saving to the database.
+
+        Returns None if there is nothing to update, otherwise dictionary
+        describing the change, which has to be passed to post_sync once the
+        unit is stored.
+        """
         component = self.translation.component
         self.is_batch_update = True
         # Get unit attributes
@@ -446,7 +485,7 @@ class Unit(models.Model, LoggerMixin):
                 pos == self.position and
                 content_hash == self.content_hash and
                 previous_source == self.previous_source):
-            return
+            return None
 
         # Ensure we track source string
         source_info, source_created = component.get_source(self.id_hash)
@@ -474,27 +513,50 @@ class Unit(models.Model, LoggerMixin):
         if created:
             unit_pre_create.send(sender=self.__class__, unit=self)
 
-        # Save into database
-        self.save(
-            force_insert=created,
-            same_content=same_source and same_target,
-            same_state=same_state,
+        # Track updated sources for source checks
+        if source_created or not same_source:
+            component.updated_sources[self.id_hash] = self
+
+        return {
+            'created': created,
+            'same_content': same_source and same_target,
+            'same_state': same_state,
+            'source_created': source_created,
+            'contentsum_changed': contentsum_changed,
+        }
+
+    def post_sync(self, sync):
+        """Post processing of unit stored in bulk after sync_from_unit.
+
+        This does the work which is otherwise done by save.
+        """
+        post_save.send(
+            sender=self.__class__,
+            instance=self,
+            created=sync['created'],
+            update_fields=None,
+            raw=False,
+            using=self._state.db,
+        )
+        # Checks are updated in bulk by Translation.store_units
+        self.update_dependents(
+            sync['same_content'], sync['same_state'], sync['created'], False
         )
 
-        # Create change object for new source string
-        if source_created:
-            Change.objects.create(
-                action=Change.ACTION_NEW_SOURCE,
-                unit=self,
-            )
-        if contentsum_changed:
-            self.update_has_failing_check(recurse=False)
+        if sync['contentsum_changed']:
             self.update_has_comment()
             self.update_has_suggestion()
 
-        # Track updated sources for source checks
-        if source_created or not same_source:
-            component.updated_sources[self.id_hash] = self
+    def get_source_change(self):
+        """Return Change object for new source string, not yet saved."""
+        translation = self.translation
+        return Change(
+            action=Change.ACTION_NEW_SOURCE,
+            unit=self,
+            translation=translation,
+            component=translation.component,
+            project=translation.component.project,
+        )
 
     def is_plural(self):
         """Check whether message is plural."""
@@ -589,11 +651,11 @@ class Unit(models.Model, LoggerMixin):
         self.source_info.run_checks(unit=self)
 
         # Generate Change object for this change
-        self.generate_change(request, user, change_action)
+        change = self.generate_change(request, user, change_action)
 
         if change_action not in (Change.ACTION_UPLOAD, Change.ACTION_AUTO):
             # Update translation stats
-            self.translation.invalidate_cache()
+            self.translation.stats.update_unit(self.old_unit, self, change)
 
             # Update user stats
             user.profile.translated += 1
@@ -622,11 +684,12 @@ class Unit(models.Model, LoggerMixin):
         ).exclude(
             id=self.id
         )
-        # Update source, number of words and content_hash
+        # Update source, number of words and hashes
         same_source.update(
             source=self.source,
             num_words=self.num_words,
-            content_hash=self.content_hash
+            content_hash=self.content_hash,
+            source_hash=self.source_hash,
         )
         # Find reverted units
         reverted = same_source.filter(
@@ -652,7 +715,7 @@ class Unit(models.Model, LoggerMixin):
             unit.update_has_comment()
             unit.update_has_suggestion()
             unit.run_checks(False, False)
-            Fulltext.update_index_unit(unit)
+            get_fulltext().update_index_unit(unit)
             Change.objects.create(
                 unit=unit,
                 action=Change.ACTION_SOURCE_CHANGE,
@@ -696,7 +759,7 @@ class Unit(models.Model, LoggerMixin):
             kwargs['old'] = self.old_unit.target
 
         # Create change object
-        Change.objects.create(
+        return Change.objects.create(
             unit=self,
             action=action,
             user=user,
@@ -710,20 +773,34 @@ class Unit(models.Model, LoggerMixin):
         Wrapper around save to warn when save did not come from
         git backend (eg. commit or by parsing file).
         """
-        # Store number of words
-        if not same_content or not self.num_words:
-            self.num_words = len(self.get_source_plurals()[0].split())
+        self.update_num_words(same_content)
+        self.update_source_hash(same_content)
 
         # Actually save the unit
         super(Unit, self).save(**kwargs)
 
+        self.update_dependents(same_content, same_state, force_insert)
+
+    def update_num_words(self, same_content=False):
+        """Store number of words."""
+        if not same_content or not self.num_words:
+            self.num_words = len(self.get_source_plurals()[0].split())
+
+    def update_source_hash(self, same_content=False):
+        """Store hash of source string used to find same strings."""
+        if not same_content or not self.source_hash:
+            self.source_hash = calculate_hash(self.source, '')
+
+    def update_dependents(self, same_content, same_state, force_insert,
+                          checks=True):
+        """Update checks and fulltext index after saving."""
         # Update checks if content or fuzzy flag has changed
-        if not same_content or not same_state:
+        if checks and (not same_content or not same_state):
             self.run_checks(same_state, same_content, force_insert)
 
         # Update fulltext index if content has changed or this is a new unit
         if force_insert or not same_content:
-            Fulltext.update_index_unit(self)
+            get_fulltext().update_index_unit(self)
 
     @cached_property
     def suggestions(self):
@@ -810,44 +887,66 @@ class Unit(models.Model, LoggerMixin):
                 return {}, True
         return {x: y for x, y in CHECKS.data.items() if y.target}, True
 
-    def run_checks(self, same_state=True, same_content=True, is_new=False):
-        """Update checks for this unit."""
-        was_change = False
-        has_checks = None
+    def evaluate_checks(self, same_state=True, is_new=False):
+        """Evaluate checks for this unit without touching the database.
 
+        Returns tuple of failing checks, checks which were skipped as they
+        are run in batch and whether no longer failing checks should be
+        removed.
+        """
         checks_to_run, cleanup_checks = self.get_checks_to_run(
             same_state, is_new
         )
 
         src = self.get_source_plurals()
         tgt = self.get_target_plurals()
-        content_hash = self.content_hash
-        project = self.translation.component.project
-        language = self.translation.language
-        old_checks = set(self.checks().values_list('check', flat=True))
+        failing = set()
+        skipped = set()
 
         # Run all target checks
         for check, check_obj in checks_to_run.items():
             if self.is_batch_update and check_obj.batch_update:
-                old_checks.discard(check)
+                skipped.add(check)
                 continue
+            start = process_time()
             if check_obj.check_target(src, tgt, self):
-                if check in old_checks:
-                    # We already have this check
-                    old_checks.remove(check)
-                else:
-                    # Create new check
-                    Check.objects.create(
-                        content_hash=content_hash,
-                        project=project,
-                        language=language,
-                        ignore=False,
-                        check=check,
-                    )
-                    was_change = True
-                    has_checks = True
+                failing.add(check)
+            record_check_time(check, process_time() - start)
+
+        return failing, skipped, cleanup_checks
+
+    def run_checks(self, same_state=True, same_content=True, is_new=False):
+        """Update checks for this unit."""
+        was_change = False
+        has_checks = None
+
+        failing, skipped, cleanup_checks = self.evaluate_checks(
+            same_state, is_new
+        )
+
+        content_hash = self.content_hash
+        project = self.translation.component.project
+        language = self.translation.language
+        old_checks = set(self.checks().values_list('check', flat=True))
+
+        # Create new checks
+        new_checks = failing - old_checks
+        if new_checks:
+            Check.objects.bulk_create([
+                Check(
+                    content_hash=content_hash,
+                    project=project,
+                    language=language,
+                    ignore=False,
+                    check=check,
+                )
+                for check in new_checks
+            ])
+            was_change = True
+            has_checks = True
 
         # Delete no longer failing checks
+        old_checks -= failing | skipped
         if cleanup_checks and old_checks:
             was_change = True
             Check.objects.filter(
@@ -861,6 +960,101 @@ class Unit(models.Model, LoggerMixin):
         if was_change or is_new or not same_content:
             self.update_has_failing_check(was_change, has_checks)
 
+    @classmethod
+    def run_checks_bulk(cls, translation, items, batch_size=1000):
+        """Update checks for units of single translation in bulk.
+
+        The items are (unit, same_state, same_content, is_new) tuples with
+        same meaning as run_checks arguments. Checks are evaluated in memory
+        and existing checks for each batch of units are loaded at once, so
+        the database is updated using few queries per batch.
+        """
+        items = list(items)
+        for start in range(0, len(items), batch_size):
+            cls.run_checks_batch(translation, items[start:start + batch_size])
+
+    @classmethod
+    def run_checks_batch(cls, translation, items):
+        project = translation.component.project
+        language = translation.language
+        checks = Check.objects.filter(project=project, language=language)
+
+        existing = defaultdict(dict)
+        for content_hash, check, ignore in checks.filter(
+                content_hash__in={item[0].content_hash for item in items}
+        ).values_list('content_hash', 'check', 'ignore'):
+            existing[content_hash][check] = ignore
+
+        create = []
+        delete = Q()
+        changed = {}
+        update = []
+
+        for unit, same_state, same_content, is_new in items:
+            failing, skipped, cleanup_checks = unit.evaluate_checks(
+                same_state, is_new
+            )
+            content_hash = unit.content_hash
+            current = existing[content_hash]
+            was_change = False
+            has_checks = None
+
+            new_checks = failing - set(current)
+            if new_checks:
+                for check in new_checks:
+                    create.append(Check(
+                        content_hash=content_hash,
+                        project=project,
+                        language=language,
+                        ignore=False,
+                        check=check,
+                    ))
+                    current[check] = False
+                was_change = True
+                has_checks = True
+
+            old_checks = set(current) - failing - skipped
+            if cleanup_checks and old_checks:
+                was_change = True
+                delete |= Q(content_hash=content_hash, check__in=old_checks)
+                for check in old_checks:
+                    del current[check]
+
+            if not (was_change or is_new or not same_content):
+                continue
+
+            if has_checks is None:
+                has_checks = (
+                    unit.state >= STATE_TRANSLATED and
+                    False in current.values()
+                )
+            if was_change:
+                changed[content_hash] = has_checks
+            if has_checks != unit.has_failing_check:
+                unit.has_failing_check = has_checks
+                update.append(unit)
+
+        if create:
+            Check.objects.bulk_create(create)
+        if delete:
+            checks.filter(delete).delete()
+        if update:
+            bulk_update(translation.unit_set, update, ['has_failing_check'])
+
+        # Units in other translations are not updated in bulk
+        if changed:
+            others = cls.objects.prefetch().filter(
+                content_hash__in=changed.keys(),
+                translation__component__project=project,
+                translation__language=language,
+            ).exclude(
+                pk__in=[item[0].pk for item in items]
+            )
+            for unit in others:
+                unit.update_has_failing_check(
+                    False, changed[unit.content_hash], True
+                )
+
     def update_has_failing_check(self, recurse=False, has_checks=None,
                                  invalidate=False):
         """Update flag counting failing checks."""
@@ -872,17 +1066,19 @@ class Unit(models.Model, LoggerMixin):
 
         # Change attribute if it has changed
         if has_checks != self.has_failing_check:
+            old_unit = copy(self)
             self.has_failing_check = has_checks
             self.save(
                 same_content=True, same_state=True,
                 update_fields=['has_failing_check']
             )
             if invalidate:
-                self.translation.invalidate_cache()
+                self.translation.stats.update_unit(old_unit, self)
 
+        # Other units are not covered by stats update of this one
         if recurse:
             for unit in Unit.objects.prefetch().same(self):
-                unit.update_has_failing_check(False, has_checks, invalidate)
+                unit.update_has_failing_check(False, has_checks, True)
 
     def update_has_suggestion(self):
         """Update flag counting suggestions."""
@@ -890,21 +1086,25 @@ class Unit(models.Model, LoggerMixin):
             del self.__dict__['suggestions']
         has_suggestion = len(self.suggestions) > 0
         if has_suggestion != self.has_suggestion:
+            old_unit = copy(self)
             self.has_suggestion = has_suggestion
             self.save(
                 same_content=True, same_state=True,
                 update_fields=['has_suggestion']
             )
+            self.translation.stats.update_unit(old_unit, self)
 
     def update_has_comment(self):
         """Update flag counting comments."""
         has_comment = len(self.get_comments()) > 0
         if has_comment != self.has_comment:
+            old_unit = copy(self)
             self.has_comment = has_comment
             self.save(
                 same_content=True, same_state=True,
                 update_fields=['has_comment']
             )
+            self.translation.stats.update_unit(old_unit, self)
 
     def nearby(self):
         """Return list of nearby messages based on location."""
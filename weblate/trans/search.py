@@ -18,25 +18,27 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-"""Whoosh based full text search."""
+"""Full text search backends."""
 
 from __future__ import absolute_import, unicode_literals
 
 import functools
+from itertools import islice
 import logging
-from time import sleep
 
 from celery_batches import Batches
 
-from whoosh.fields import SchemaClass, TEXT, NUMERIC
+from whoosh.fields import SchemaClass, TEXT, NUMERIC, ID
 from whoosh.query import Or, Term
 from whoosh.index import LockError
 from whoosh import qparser
 
+from django.conf import settings
 from django.utils.encoding import force_text
 
 from weblate.celery import app
 from weblate.utils.celery import extract_batch_args, extract_batch_kwargs
+from weblate.utils.classloader import load_class
 from weblate.utils.index import WhooshIndex
 
 LOGGER = logging.getLogger('weblate.search')
@@ -45,6 +47,7 @@ LOGGER = logging.getLogger('weblate.search')
 class TargetSchema(SchemaClass):
     """Fultext index schema for target strings."""
     pk = NUMERIC(stored=True, unique=True)
+    component = ID()
     target = TEXT()
     comment = TEXT()
 
@@ -52,14 +55,190 @@ class TargetSchema(SchemaClass):
 class SourceSchema(SchemaClass):
     """Fultext index schema for source and context strings."""
     pk = NUMERIC(stored=True, unique=True)
+    component = ID()
+    language = ID()
     source = TEXT()
     context = TEXT()
     location = TEXT()
 
 
-class Fulltext(WhooshIndex):
-    LOCATION = 'whoosh'
+def get_fulltext():
+    """Return fulltext search backend configured by SEARCH_BACKEND."""
+    return load_class(settings.SEARCH_BACKEND, 'SEARCH_BACKEND')()
+
+
+class BaseFulltext(object):
+    """Fulltext search backend interface."""
     FAKE = False
+    # Number of search results matched against the database at once
+    PAGE_SIZE = 500
+
+    @classmethod
+    def update_index_unit(cls, unit):
+        """Add single unit to index."""
+        raise NotImplementedError()
+
+    @classmethod
+    def clean_search_unit(cls, pk, lang):
+        """Cleanup search index on unit deletion."""
+        raise NotImplementedError()
+
+    def iterate_search(self, query, langs, params, components=None):
+        """Perform fulltext search in given areas.
+
+        Yields primary keys of matching units, best matches first. The
+        search is limited to given component IDs unless it is None.
+        """
+        raise NotImplementedError()
+
+    def search(self, query, langs, params):
+        """Perform fulltext search in given areas.
+
+        Returns set of primary keys.
+        """
+        raise NotImplementedError()
+
+    def filter_units(self, queryset, query, params, langs=None,
+                     components=None):
+        """Filter units queryset by fulltext search.
+
+        The languages and components define scope of the search, all
+        languages with translations are searched if langs is None.
+        """
+        if langs is None:
+            from weblate.lang.models import Language
+            langs = Language.objects.have_translation().values_list(
+                'code', flat=True
+            )
+        return FulltextResults(
+            queryset,
+            functools.partial(
+                self.iterate_search, query, set(langs), params, components
+            ),
+            self.PAGE_SIZE,
+        )
+
+    def more_like(self, unit, queryset, top=5):
+        """Find units similar to given unit.
+
+        The search is limited to the queryset, which has to contain only
+        units in same language. Returns list of primary keys.
+        """
+        raise NotImplementedError()
+
+
+class FulltextResults(object):
+    """Units matching fulltext search, best matches first.
+
+    The search results are matched against the queryset page by page as
+    they are needed, so no query ever lists all of them. It implements
+    subset of the QuerySet interface used by the views.
+    """
+    ordered = True
+
+    def __init__(self, queryset, search, page_size):
+        self.queryset = queryset
+        self.page_size = page_size
+        self._search = search
+        self._results = None
+        self._seen = set()
+        self._matched = []
+        self._done = False
+
+    def filter(self, *args, **kwargs):
+        return FulltextResults(
+            self.queryset.filter(*args, **kwargs),
+            self._search,
+            self.page_size,
+        )
+
+    def fetch(self, count=None):
+        """Match search results until there are count matching units."""
+        if self._results is None:
+            self._results = self._search()
+        while not self._done and (count is None or len(self._matched) < count):
+            results = list(islice(self._results, self.page_size))
+            if not results:
+                self._done = True
+                break
+            # The unit can be found in several indexes
+            page = []
+            for pk in results:
+                if pk not in self._seen:
+                    self._seen.add(pk)
+                    page.append(pk)
+            matching = set(
+                self.queryset.filter(pk__in=page).values_list('pk', flat=True)
+            )
+            self._matched.extend(pk for pk in page if pk in matching)
+        return self._matched
+
+    def get_units(self, pks):
+        """Return units with given primary keys in same order."""
+        units = self.queryset.in_bulk(pks)
+        return [units[pk] for pk in pks if pk in units]
+
+    def count(self):
+        return len(self.fetch())
+
+    def __len__(self):
+        return self.count()
+
+    def exists(self):
+        return bool(self.fetch(1))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.stop is None or key.stop < 0 or (key.start or 0) < 0:
+                matched = self.fetch()
+            else:
+                matched = self.fetch(key.stop)
+            return self.get_units(matched[key])
+        if key < 0:
+            matched = self.fetch()
+        else:
+            matched = self.fetch(key + 1)
+        return self.get_units([matched[key]])[0]
+
+    def __iter__(self):
+        offset = 0
+        while True:
+            pks = self.fetch(offset + self.page_size)[
+                offset:offset + self.page_size
+            ]
+            if not pks:
+                return
+            for unit in self.get_units(pks):
+                yield unit
+            offset += len(pks)
+
+    def iterator(self):
+        return iter(self)
+
+    def values_list(self, field, flat=False):
+        """Return values of single field of matching units."""
+        pks = self.fetch()
+        result = []
+        for offset in range(0, len(pks), self.page_size):
+            page = pks[offset:offset + self.page_size]
+            values = dict(
+                self.queryset.filter(pk__in=page).values_list('pk', field)
+            )
+            result.extend(values[pk] for pk in page if pk in values)
+        if flat:
+            return result
+        return [(value,) for value in result]
+
+
+class Fulltext(WhooshIndex, BaseFulltext):
+    """Whoosh based fulltext search.
+
+    The index is stored in the DATA_DIR with separate index for every
+    language.
+    """
+    LOCATION = 'whoosh'
+    # Cache of has_field results
+    FIELDS_CACHE = {}
 
     def get_source_index(self):
         return self.open_index(SourceSchema, 'source')
@@ -78,10 +257,14 @@ class Fulltext(WhooshIndex):
                 'context': unit.context,
                 'location': unit.location,
                 'pk': unit.pk,
+                'component': unit.translation.component_id,
+                'language': unit.translation.language.code,
             }
         writer.delete_by_term('pk', unit['pk'], searcher)
         writer.add_document(
             pk=unit['pk'],
+            component=force_text(unit.get('component', '')),
+            language=force_text(unit.get('language', '')),
             source=force_text(unit['source']),
             context=force_text(unit['context']),
             location=force_text(unit['location']),
@@ -93,12 +276,14 @@ class Fulltext(WhooshIndex):
         if not isinstance(unit, dict):
             unit = {
                 'pk': unit.pk,
+                'component': unit.translation.component_id,
                 'target': unit.target,
                 'comment': unit.comment,
             }
         writer.delete_by_term('pk', unit['pk'], searcher)
         writer.add_document(
             pk=unit['pk'],
+            component=force_text(unit.get('component', '')),
             target=force_text(unit['target']),
             comment=force_text(unit['comment']),
         )
@@ -108,7 +293,7 @@ class Fulltext(WhooshIndex):
 
         # Update source index
         index = self.get_source_index()
-        with index.writer() as writer:
+        with self.open_writer(index, SourceSchema) as writer:
             with writer.searcher() as searcher:
                 for unit in units:
                     self.update_source_unit_index(writer, searcher, unit)
@@ -118,7 +303,7 @@ class Fulltext(WhooshIndex):
         # Update per language indices
         for language in languages:
             index = self.get_target_index(language)
-            with index.writer() as writer:
+            with self.open_writer(index, TargetSchema) as writer:
                 with writer.searcher() as searcher:
                     for unit in units:
                         if unit['language'] != language:
@@ -131,6 +316,7 @@ class Fulltext(WhooshIndex):
         if not cls.FAKE:
             update_fulltext.delay(
                 pk=unit.pk,
+                component=unit.translation.component_id,
                 source=force_text(unit.source),
                 context=force_text(unit.context),
                 location=force_text(unit.location),
@@ -139,10 +325,41 @@ class Fulltext(WhooshIndex):
                 language=force_text(unit.translation.language.code),
             )
 
-    @staticmethod
-    def base_search(index, query, params, search, schema):
-        """Wrapper for fulltext search."""
+    def has_field(self, index, searcher, field):
+        """Check whether all documents in the index have the field.
+
+        The documents indexed by older versions have no component and
+        language, so the search can not be limited using them until the
+        index is rebuilt. The result is cached for index generation.
+        """
+        key = (self.storage.folder, index.indexname, field)
+        generation = index.latest_generation()
+        cached = self.FIELDS_CACHE.get(key)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        result = field in searcher.schema
+        if result:
+            reader = searcher.reader()
+            # Deleted documents are included as well, what can only make
+            # the check fail until the index is optimized
+            count = sum(
+                reader.doc_frequency(field, term)
+                for term in reader.lexicon(field) if term
+            )
+            result = count >= searcher.doc_count_all()
+        self.FIELDS_CACHE[key] = (generation, result)
+        return result
+
+    def base_search(self, index, query, params, search, schema, scope=None):
+        """Wrapper for fulltext search, yields matching primary keys.
+
+        The results are not limited by scope if the index does not have
+        components, they are filtered by the unit queryset anyway.
+        """
         with index.searcher() as searcher:
+            if scope is not None and not self.has_field(
+                    index, searcher, 'component'):
+                scope = None
             queries = []
             for param in params:
                 if search[param]:
@@ -151,17 +368,20 @@ class Fulltext(WhooshIndex):
                         parser.parse(query)
                     )
             terms = functools.reduce(lambda x, y: x | y, queries)
-            return [
-                result['pk'] for result in searcher.search(terms, limit=None)
-            ]
-
-    def search(self, query, langs, params):
-        """Perform fulltext search in given areas.
-
-        Returns set of primary keys.
-        """
-        pks = set()
+            for result in searcher.search(terms, limit=None, filter=scope):
+                yield result['pk']
 
+    @staticmethod
+    def get_scope(components):
+        """Return query limiting search to given components."""
+        if components is None:
+            return None
+        return Or([Term('component', force_text(pk)) for pk in components])
+
+    def iterate_search(self, query, langs, params, components=None):
+        if components is not None and not components:
+            return
+        scope = self.get_scope(components)
         search = {
             'source': False,
             'context': False,
@@ -172,37 +392,39 @@ class Fulltext(WhooshIndex):
         search.update(params)
 
         if search['source'] or search['context'] or search['location']:
-            pks.update(
-                self.base_search(
+            for pk in self.base_search(
                     self.get_source_index(),
                     query,
                     ('source', 'context', 'location'),
                     search,
-                    SourceSchema()
-                )
-            )
+                    SourceSchema(),
+                    scope):
+                yield pk
 
         if search['target'] or search['comment']:
             for lang in langs:
-                pks.update(
-                    self.base_search(
+                for pk in self.base_search(
                         self.get_target_index(lang),
                         query,
                         ('target', 'comment'),
                         search,
-                        TargetSchema()
-                    )
-                )
+                        TargetSchema(),
+                        scope):
+                    yield pk
+
+    def search(self, query, langs, params):
+        """Perform fulltext search in given areas.
 
-        return pks
+        Returns set of primary keys.
+        """
+        return set(self.iterate_search(query, langs, params))
 
-    def more_like(self, pk, source, top=5):
-        """Find similar units."""
+    def more_like(self, unit, queryset, top=5):
         index = self.get_source_index()
         with index.searcher() as searcher:
             # Extract key terms
             kts = searcher.key_terms_from_text(
-                'source', source,
+                'source', unit.source,
                 numterms=10,
                 normalize=False
             )
@@ -212,10 +434,25 @@ class Fulltext(WhooshIndex):
             )
             LOGGER.debug('more like query: %r', query)
 
-            # Grab fulltext results
-            results = [
-                (h['pk'], h.score) for h in searcher.search(query, limit=top)
-            ]
+            # Grab fulltext results in same language
+            if self.has_field(index, searcher, 'language'):
+                scope = Term('language', unit.translation.language.code)
+                hits = searcher.search(query, limit=top, filter=scope)
+                results = [(h['pk'], h.score) for h in hits]
+            else:
+                # Index without languages, match all results against
+                # the queryset until there is enough of them
+                hits = [
+                    (h['pk'], h.score)
+                    for h in searcher.search(query, limit=None)
+                ]
+                scores = dict(hits)
+                matches = FulltextResults(
+                    queryset,
+                    functools.partial(iter, [pk for pk, score in hits]),
+                    self.PAGE_SIZE
+                )
+                results = [(pk, scores[pk]) for pk in matches.fetch(top)[:top]]
             LOGGER.debug('found %d matches', len(results))
             if not results:
                 return []
@@ -227,7 +464,10 @@ class Fulltext(WhooshIndex):
                 'filter %d matches over threshold %d', len(results), threshold
             )
 
-            return results
+            matching = set(
+                queryset.filter(pk__in=results).values_list('pk', flat=True)
+            )
+            return [pk for pk in results if pk in matching]
 
     @classmethod
     def clean_search_unit(cls, pk, lang):
@@ -235,9 +475,8 @@ class Fulltext(WhooshIndex):
         if not cls.FAKE:
             delete_fulltext.delay(pk, lang)
 
-    @staticmethod
-    def delete_units_index(index, units):
-        with index.writer() as writer:
+    def delete_units_index(self, index, units):
+        with self.open_writer(index) as writer:
             with writer.searcher() as searcher:
                 for pk in units:
                     writer.delete_by_term('pk', pk, searcher)
@@ -257,9 +496,85 @@ class Fulltext(WhooshIndex):
             )
 
 
+class PostgreSQLFulltext(BaseFulltext):
+    """PostgreSQL based fulltext search.
+
+    It uses GIN indices on the unit table, so there is no separate index to
+    be updated.
+    """
+    SOURCE_FIELDS = ('source', 'context', 'location')
+    TARGET_FIELDS = ('target', 'comment')
+    MATCH = (
+        "to_tsvector('simple', trans_unit.{0}) @@ "
+        "plainto_tsquery('simple', %s)"
+    )
+    # Match any of the words
+    SIMILAR = (
+        "to_tsquery('simple', replace("
+        "plainto_tsquery('simple', %s)::text, '&', '|'))"
+    )
+
+    @classmethod
+    def update_index_unit(cls, unit):
+        return
+
+    @classmethod
+    def clean_search_unit(cls, pk, lang):
+        return
+
+    def filter_units(self, queryset, query, params, langs=None,
+                     components=None):
+        """Filter units queryset by fulltext search.
+
+        The condition is added to the queryset, so the database matches
+        only units within its scope.
+        """
+        fields = [
+            field for field in self.SOURCE_FIELDS + self.TARGET_FIELDS
+            if params.get(field)
+        ]
+        if not fields:
+            return queryset.none()
+        return queryset.extra(
+            where=['({0})'.format(
+                ' OR '.join(self.MATCH.format(field) for field in fields)
+            )],
+            params=[query] * len(fields)
+        )
+
+    def search(self, query, langs, params):
+        from weblate.trans.models import Unit
+        return set(self.filter_units(
+            Unit.objects.filter(translation__language__code__in=langs),
+            query,
+            params,
+        ).values_list('pk', flat=True))
+
+    def more_like(self, unit, queryset, top=5):
+        vector = "to_tsvector('simple', trans_unit.source)"
+        results = list(queryset.extra(
+            select={
+                'rank': 'ts_rank({0}, {1})'.format(vector, self.SIMILAR)
+            },
+            select_params=[force_text(unit.source)],
+            where=['{0} @@ {1}'.format(vector, self.SIMILAR)],
+            params=[force_text(unit.source)],
+        ).order_by('-rank').values_list('pk', 'rank')[:top])
+        if not results:
+            return []
+
+        # Filter bad results
+        threshold = max([rank for pk, rank in results]) / 2
+        return [pk for pk, rank in results if rank > threshold]
+
+
 @app.task(base=Batches, flush_every=1000, flush_interval=300, bind=True)
 def update_fulltext(self, *args, **kwargs):
-    unitdata = extract_batch_kwargs(*args, **kwargs)
+    # Coalesce updates of same unit, only the last one matters
+    unitdata = list(
+        {unit['pk']: unit for unit in extract_batch_kwargs(*args, **kwargs)}
+        .values()
+    )
     fulltext = Fulltext()
 
     # Update index
@@ -269,14 +584,13 @@ def update_fulltext(self, *args, **kwargs):
         LOGGER.info('retrying update batch of len %d', len(unitdata))
         # Manually handle retries, it doesn't work
         # with celery-batches
-        sleep(10)
         for unit in unitdata:
             update_fulltext.delay(**unit)
 
 
 @app.task(base=Batches, flush_every=1000, flush_interval=300, bind=True)
 def delete_fulltext(self, *args):
-    ids = extract_batch_args(*args)
+    ids = {tuple(item) for item in extract_batch_args(*args)}
     fulltext = Fulltext()
 
     units = set()
@@ -295,6 +609,5 @@ def delete_fulltext(self, *args):
         LOGGER.info('retrying delete batch of len %d', len(ids))
         # Manually handle retries, it doesn't work
         # with celery-batches
-        sleep(10)
         for unit in ids:
             delete_fulltext.delay(*unit)
@@ -20,6 +20,7 @@
 
 from __future__ import absolute_import, unicode_literals
 
+from collections import defaultdict
 from datetime import timedelta
 from glob import glob
 import os
@@ -28,7 +29,10 @@ from time import time
 
 from celery.schedules import crontab
 
+from six.moves.urllib.parse import urlparse
+
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 from django.utils import timezone
 
@@ -43,11 +47,20 @@ from weblate.lang.models import Language
 
 from weblate.trans.models import (
     Suggestion, Comment, Unit, Project, Source, Component, Change,
+    Translation, ComponentList,
 )
 from weblate.trans.exceptions import FileParseError
-from weblate.trans.search import Fulltext
+from weblate.trans.search import Fulltext, get_fulltext
 from weblate.utils.data import data_dir
 from weblate.utils.files import remove_readonly
+from weblate.utils.stats import GlobalStats
+from weblate.vcs.base import RepositoryException
+
+# Maximal number of update_remotes runs skipped for failing components
+UPDATE_BACKOFF_MAX = 16
+
+# Seconds after which a pending hook update is considered lost
+HOOK_TIMEOUT = 3600
 
 
 @app.task
@@ -64,6 +77,35 @@ def perform_update(cls, pk):
         return
 
 
+def get_hook_update_key(pk):
+    return 'hook-update-{}'.format(pk)
+
+
+@app.task
+def perform_hook_update(pk):
+    """Perform update requested by a hook, see request_hook_update."""
+    # Requests received from now on need another update
+    cache.delete(get_hook_update_key(pk))
+    perform_update('Component', pk)
+
+
+def request_hook_update(pk):
+    """Request update of a component from a hook.
+
+    The update is delayed by HOOK_UPDATE_WINDOW and all requests received
+    until it starts are coalesced into it. Requests received while it is
+    running are coalesced into single following update.
+
+    Returns True if the request was coalesced.
+    """
+    window = settings.HOOK_UPDATE_WINDOW
+    # The timeout allows new update in case the pending one got lost
+    if not cache.add(get_hook_update_key(pk), True, window + HOOK_TIMEOUT):
+        return True
+    perform_hook_update.apply_async((pk,), countdown=window)
+    return False
+
+
 @app.task
 def perform_load(pk, *args):
     component = Component.objects.get(pk=pk)
@@ -117,7 +159,9 @@ def commit_pending(hours=None, pks=None, logger=None):
 @app.task
 def cleanup_fulltext():
     """Remove stale units from fulltext"""
-    fulltext = Fulltext()
+    fulltext = get_fulltext()
+    if not isinstance(fulltext, Fulltext):
+        return
     languages = list(Language.objects.values_list('code', flat=True)) + [None]
     # We operate only on target indexes as they will have all IDs anyway
     for lang in languages:
@@ -137,7 +181,9 @@ def cleanup_fulltext():
 
 @app.task
 def optimize_fulltext():
-    fulltext = Fulltext()
+    fulltext = get_fulltext()
+    if not isinstance(fulltext, Fulltext):
+        return
     index = fulltext.get_source_index()
     index.optimize()
     languages = Language.objects.have_translation()
@@ -245,15 +291,114 @@ def cleanup_suggestions():
                 )
 
 
+def get_remote_host(url):
+    """Return host of the repository URL, used to limit concurrency."""
+    parsed = urlparse(url)
+    if parsed.hostname:
+        return parsed.hostname
+    # scp-like syntax: user@host:path
+    if ':' in url:
+        return url.split(':', 1)[0].rsplit('@', 1)[-1]
+    return ''
+
+
+def get_update_status(pk):
+    """Return status of the component in update_remotes.
+
+    It contains duration of the last update, number of consecutive
+    failures and number of following runs in which it is skipped.
+    """
+    return cache.get(
+        'update-remotes-{}'.format(pk),
+        {'duration': None, 'failures': 0, 'skip': 0}
+    )
+
+
+def set_update_status(pk, status):
+    cache.set('update-remotes-{}'.format(pk), status, 30 * 86400)
+
+
+def update_remote_component(component, status, remote_head):
+    """Update component unless it already has current remote revision."""
+    if remote_head is not None:
+        repository = component.repository
+        try:
+            current = repository.last_remote_revision == remote_head
+            if current and settings.AUTO_UPDATE:
+                current = not repository.needs_merge()
+        except RepositoryException:
+            current = False
+        if current:
+            return
+
+    start = time()
+    if settings.AUTO_UPDATE:
+        result = component.do_update()
+    else:
+        result = component.update_remote_branch()
+    status['duration'] = time() - start
+
+    # Back off exponentially on repeated failures
+    if result:
+        status['failures'] = 0
+    else:
+        status['failures'] += 1
+        status['skip'] = min(
+            2 ** (status['failures'] - 1) - 1, UPDATE_BACKOFF_MAX
+        )
+    set_update_status(component.pk, status)
+
+
+@app.task
+def update_remote_groups(groups):
+    """Update groups of components sharing repository and branch.
+
+    The remote is queried only once for every group.
+    """
+    for pks in groups:
+        components = []
+        for component in Component.objects.filter(pk__in=pks).order_by('pk'):
+            status = get_update_status(component.pk)
+            if status['skip']:
+                status['skip'] -= 1
+                set_update_status(component.pk, status)
+                continue
+            components.append((component, status))
+
+        if not components:
+            continue
+
+        try:
+            remote_head = components[0][0].repository.get_remote_head()
+        except RepositoryException:
+            # The failure is reported by the update
+            remote_head = None
+
+        for component, status in components:
+            update_remote_component(component, status, remote_head)
+
+
 @app.task
 def update_remotes():
-    """Update all remote branches (without attempt to merge)."""
+    """Update all remote branches (without attempt to merge).
+
+    Components sharing repository and branch are processed together and at
+    most UPDATE_REMOTES_CONCURRENCY tasks are run against single host.
+    """
+    groups = defaultdict(list)
     non_linked = Component.objects.exclude(repo__startswith='weblate:')
-    for component in non_linked.iterator():
-        if settings.AUTO_UPDATE:
-            component.do_update()
-        else:
-            component.update_remote_branch()
+    values = non_linked.values_list('pk', 'vcs', 'repo', 'branch')
+    for pk, vcs, repo, branch in values.iterator():
+        groups[(vcs, repo, branch)].append(pk)
+
+    hosts = defaultdict(list)
+    for key in sorted(groups):
+        hosts[get_remote_host(key[1])].append(groups[key])
+
+    concurrency = max(1, settings.UPDATE_REMOTES_CONCURRENCY)
+    for host_groups in hosts.values():
+        for offset in range(min(concurrency, len(host_groups))):
+            update_remote_groups.delay(host_groups[offset::concurrency])
 
 
 @app.task
@@ -299,11 +444,11 @@ def cleanup_old_suggestions():
 def repository_alerts(threshold=10):
     non_linked = Component.objects.exclude(repo__startswith='weblate:')
     for component in non_linked.iterator():
-        if component.repository.count_missing() > 10:
+        if component.repository.count_missing() > threshold:
             component.add_alert('RepositoryOutdated', childs=True)
         else:
             component.delete_alert('RepositoryOutdated', childs=True)
-        if component.repository.count_outgoing() > 10:
+        if component.repository.count_outgoing() > threshold:
             component.add_alert('RepositoryChanges', childs=True)
         else:
             component.delete_alert('RepositoryChanges', childs=True)
@@ -315,6 +460,27 @@ def component_alerts():
         component.update_alerts()
 
 
+@app.task
+def reconcile_stats():
+    """Fix drift of incrementally updated stats.
+
+    Lower levels go first as invalidating them clears the upper ones.
+    """
+    for translation in Translation.objects.prefetch().iterator():
+        translation.stats.reconcile()
+    for component in Component.objects.iterator():
+        component.stats.reconcile()
+    for project in Project.objects.iterator():
+        for stats in project.stats.get_language_stats():
+            stats.reconcile()
+        project.stats.reconcile()
+    for componentlist in ComponentList.objects.iterator():
+        componentlist.stats.reconcile()
+    for language in Language.objects.have_translation():
+        language.stats.reconcile()
+    GlobalStats().reconcile()
+
+
 @app.on_after_finalize.connect
 def setup_periodic_tasks(sender, **kwargs):
     sender.add_periodic_task(
@@ -352,6 +518,11 @@ def setup_periodic_tasks(sender, **kwargs):
         cleanup_old_suggestions.s(),
         name='cleanup-old-suggestions',
     )
+    sender.add_periodic_task(
+        3600 * 24,
+        reconcile_stats.s(),
+        name='reconcile-stats',
+    )
 
     # Following fulltext maintenance tasks should not be
     # executed at same time
@@ -20,10 +20,14 @@
 
 """Test for automatic translation"""
 
+from __future__ import unicode_literals
+
 from django.urls import reverse
 from django.core.management import call_command
 from django.core.management.base import CommandError
 
+from weblate.machinery.dummy import DummyTranslation
+from weblate.trans.autotranslate import AutoTranslate
 from weblate.trans.models import Component
 from weblate.trans.tests.test_views import ViewTestCase
 
@@ -285,3 +289,18 @@ class AutoTranslationMtTest(ViewTestCase):
 
     def test_overwrite(self):
         self.perform_auto(overwrite='1', engines=['weblate'], threshold=80)
+
+    def test_translate_units(self):
+        translation = self.get_translation()
+        auto = AutoTranslate(self.user, translation, 'all')
+        units = list(auto.get_units().prefetch())
+        machine = DummyTranslation()
+        machine.concurrency = 1
+        expected = auto.translate_units(machine, units)
+        self.assertEqual(len(expected), len(units))
+        self.assertIn(
+            'Nazdar světe!',
+            [item['text'] for result in expected for item in result]
+        )
+        machine.concurrency = 4
+        self.assertEqual(auto.translate_units(machine, units), expected)
@@ -23,7 +23,9 @@
 import json
 
 from django.urls import reverse
+from django.utils import timezone
 
+from weblate.trans.models import Change
 from weblate.trans.tests.test_views import FixtureTestCase
 
 
@@ -105,3 +107,60 @@ class ChartsTest(FixtureTestCase):
             )
         )
         self.assert_json_chart_data(response)
+
+    def test_activity_rollup(self):
+        """Test of incremental counting of activity."""
+        def count():
+            return sum(
+                item[1] for item in Change.objects.base_stats(
+                    31, 1, project=self.project
+                )
+            )
+
+        initial = count()
+        Change.objects.create(
+            translation=self.get_translation(),
+            action=Change.ACTION_CHANGE,
+            user=self.user,
+        )
+        self.assertEqual(count(), initial + 1)
+
+        stats = Change.objects.base_stats(364, 7, project=self.project)
+        self.assertEqual(len(stats), 52)
+        self.assertEqual(
+            stats[-1][0], timezone.localdate() - timezone.timedelta(days=6)
+        )
+        self.assertEqual(sum(item[1] for item in stats), initial + 1)
+
+    def test_activity_rollup_late(self):
+        """Test of counting changes committed out of order."""
+        def count():
+            return sum(
+                item[1] for item in Change.objects.base_stats(
+                    31, 1, project=self.project
+                )
+            )
+
+        initial = count()
+        late = Change.objects.create(
+            translation=self.get_translation(),
+            action=Change.ACTION_CHANGE,
+            user=self.user,
+        )
+        late_pk = late.pk
+        late.delete()
+        Change.objects.create(
+            translation=self.get_translation(),
+            action=Change.ACTION_CHANGE,
+            user=self.user,
+        )
+        self.assertEqual(count(), initial + 1)
+        # Change with lower id showing up later is counted
+        Change.objects.create(
+            pk=late_pk,
+            translation=self.get_translation(),
+            action=Change.ACTION_CHANGE,
+            user=self.user,
+        )
+        self.assertEqual(count(), initial + 2)
+        self.assertEqual(count(), initial + 2)
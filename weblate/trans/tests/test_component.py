@@ -24,6 +24,7 @@ import os
 import shutil
 
 from django.core.exceptions import ValidationError
+from django.test.utils import override_settings
 
 from weblate.checks.models import Check
 from weblate.trans.exceptions import FileParseError
@@ -178,6 +179,18 @@ class ComponentTest(RepoTestCase):
         component = self.create_android()
         self.verify_component(component, 2, 'cs', 4)
 
+    @override_settings(PARSE_PROCESSES=2)
+    def test_create_po_parallel(self):
+        component = self.create_po()
+        self.verify_component(component, 3, 'cs', 4)
+        component.create_translations(force=True)
+        self.verify_component(component, 3, 'cs', 4)
+
+    @override_settings(PARSE_PROCESSES=2)
+    def test_create_android_parallel(self):
+        component = self.create_android()
+        self.verify_component(component, 2, 'cs', 4)
+
     def test_create_json(self):
         component = self.create_json()
         self.verify_component(component, 1, 'cs', 4)
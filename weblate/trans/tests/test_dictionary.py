@@ -405,6 +405,38 @@ class DictionaryTest(FixtureTestCase):
             1
         )
 
+    def test_get_words_changed(self):
+        translation = self.get_translation()
+        unit = self.get_unit('Thank you for using Weblate.')
+        word = Dictionary.objects.create(
+            self.user,
+            project=self.project,
+            language=translation.language,
+            source='Thank',
+            target='díky',
+        )
+        self.assertEqual(
+            list(Dictionary.objects.get_words(unit)),
+            [word]
+        )
+        word.source = 'hello'
+        word.save()
+        self.assertEqual(
+            Dictionary.objects.get_words(unit).count(),
+            0
+        )
+        word.source = 'weblate'
+        word.save()
+        self.assertEqual(
+            Dictionary.objects.get_words(unit).count(),
+            1
+        )
+        word.delete()
+        self.assertEqual(
+            Dictionary.objects.get_words(unit).count(),
+            0
+        )
+
     def test_add(self):
         """Test for adding word from translate page"""
 
@@ -27,6 +27,7 @@ from django.urls import reverse
 
 from weblate.trans.tests.test_views import ViewTestCase
 from weblate.trans.models import Change
+from weblate.trans.views.edit import get_other_units
 from weblate.utils.hash import hash_to_checksum
 from weblate.utils.state import STATE_TRANSLATED, STATE_FUZZY
 
@@ -754,3 +755,16 @@ class EditComplexTest(ViewTestCase):
         self.assertEqual(unit.target, 'Nazdar svete!\n')
         self.assertEqual(unit.state, STATE_TRANSLATED)
         self.assert_backend(1)
+
+
+class OtherUnitsTest(ViewTestCase):
+    def test_other_units(self):
+        unit = self.get_unit()
+        self.assertFalse(get_other_units(unit)['exists'])
+
+        self.create_po(name='Other', project=self.project)
+        others = get_other_units(unit)
+        self.assertEqual(others['same'], [unit])
+        self.assertEqual(len(others['matching']), 1)
+        self.assertEqual(others['matching'][0].source, unit.source)
+        self.assertEqual(others['count'], 1)
@@ -24,10 +24,12 @@ from __future__ import unicode_literals
 
 import json
 
+from django.core.cache import cache
 from django.urls import reverse
 from django.test import SimpleTestCase
 from django.test.utils import override_settings
 
+from weblate.trans.tasks import get_hook_update_key
 from weblate.trans.views.hooks import HOOK_HANDLERS
 from weblate.trans.tests.test_views import ViewTestCase
 
@@ -625,6 +627,25 @@ class HooksViewTest(ViewTestCase):
         )
         self.assertContains(response, 'Update triggered')
 
+    @override_settings(ENABLE_HOOKS=True)
+    def test_hook_github_coalesced(self):
+        # Adjust matching repo
+        self.component.repo = 'git://github.com/defunkt/github.git'
+        self.component.save()
+        response = self.client.post(
+            reverse('webhook', kwargs={'service': 'github'}),
+            {'payload': GITHUB_PAYLOAD}
+        )
+        self.assertFalse(response.json()['coalesced'])
+        # Simulate pending update
+        cache.add(get_hook_update_key(self.component.pk), True)
+        response = self.client.post(
+            reverse('webhook', kwargs={'service': 'github'}),
+            {'payload': GITHUB_PAYLOAD}
+        )
+        self.assertContains(response, 'Update triggered')
+        self.assertTrue(response.json()['coalesced'])
+
     @override_settings(ENABLE_HOOKS=True)
     def test_hook_github_new(self):
         # Adjust matching repo
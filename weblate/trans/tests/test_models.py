@@ -24,6 +24,7 @@
 import os
 import shutil
 
+from django.core.cache import cache
 from django.core.management.color import no_style
 from django.db import connection
 from django.http.request import HttpRequest
@@ -34,11 +35,13 @@ from weblate.auth.models import User, Group
 from weblate.checks.models import Check
 from weblate.trans.models import (
     Project, Source, Unit, WhiteboardMessage, ComponentList, AutoComponentList,
-    Component,
+    Component, Translation, Change,
 )
 from weblate.lang.models import Language
 from weblate.trans.tests.utils import RepoTestMixin, create_test_user
-from weblate.utils.state import STATE_TRANSLATED
+from weblate.utils.state import STATE_TRANSLATED, STATE_FUZZY
+from weblate.utils.models import StoredStats
+from weblate.utils.stats import GlobalStats, prefetch_stats
 
 
 def fixup_languages_seq():
@@ -171,6 +174,178 @@ class TranslationTest(RepoTestCase):
         self.assertEqual(translation.stats.all, 0)
         self.assertEqual(translation.stats.all_words, 0)
 
+    def test_update_stats_incremental(self):
+        """Check stats are updated without recalculating them."""
+        component = self.create_component()
+        translation = component.translation_set.get(language_code='cs')
+        self.assertEqual(translation.stats.translated, 0)
+        changes = translation.stats.total_changes
+        translated = component.stats.translated
+        self.assertEqual(component.project.stats.translated, translated)
+        self.assertEqual(GlobalStats().translated, translated)
+        request = HttpRequest()
+        request.user = create_test_user()
+        unit = translation.unit_set.all()[0]
+        unit.translate(request, 'test', STATE_TRANSLATED)
+        translation = Translation.objects.get(pk=translation.pk)
+        self.assertEqual(translation.stats.translated, 1)
+        self.assertEqual(translation.stats.translated_words, unit.num_words)
+        self.assertEqual(translation.stats.todo, 3)
+        self.assertEqual(translation.stats.total_changes, changes + 1)
+        component = Component.objects.get(pk=component.pk)
+        self.assertEqual(component.stats.translated, translated + 1)
+        self.assertEqual(
+            component.project.stats.translated, translated + 1
+        )
+        self.assertEqual(GlobalStats().translated, translated + 1)
+        # The cached stats should match calculated ones
+        self.assertTrue(translation.stats.reconcile())
+        self.assertTrue(component.stats.reconcile())
+        self.assertTrue(GlobalStats().reconcile())
+
+    def test_reconcile_stats(self):
+        """Check drift of cached stats is fixed."""
+        component = self.create_component()
+        translation = component.translation_set.get(language_code='cs')
+        self.assertEqual(translation.stats.translated, 0)
+        translated = component.stats.translated
+        translation.stats.apply_delta({'translated': 1})
+        component = Component.objects.get(pk=component.pk)
+        self.assertEqual(component.stats.translated, translated + 1)
+        self.assertFalse(translation.stats.reconcile())
+        translation = Translation.objects.get(pk=translation.pk)
+        self.assertEqual(translation.stats.translated, 0)
+        component = Component.objects.get(pk=component.pk)
+        self.assertEqual(component.stats.translated, translated)
+
+    def test_reconcile_recent_changes(self):
+        """Check recent changes counter is updated by reconcile."""
+        component = self.create_component()
+        translation = component.translation_set.get(language_code='cs')
+        recent = translation.stats.recent_changes
+        translation.stats.apply_delta({'recent_changes': 10})
+        translation = Translation.objects.get(pk=translation.pk)
+        self.assertEqual(translation.stats.recent_changes, recent + 10)
+        self.assertTrue(translation.stats.reconcile())
+        translation = Translation.objects.get(pk=translation.pk)
+        self.assertEqual(translation.stats.recent_changes, recent)
+
+    def test_stats_delta_concurrent(self):
+        """Check saving stale stats does not lose counter updates."""
+        component = self.create_component()
+        translation = component.translation_set.get(language_code='cs')
+        translated = translation.stats.translated
+        stale = Translation.objects.get(pk=translation.pk).stats
+        stale.ensure_basic()
+        translation.stats.apply_delta({'translated': 1})
+        # Calculating other stats saves the loaded data
+        self.assertEqual(stale.suggestions, 0)
+        stale.save()
+        translation = Translation.objects.get(pk=translation.pk)
+        self.assertEqual(translation.stats.translated, translated + 1)
+        self.assertEqual(translation.stats.translated_percent, 25.0)
+
+    @override_settings(STATS_DATABASE=True)
+    def test_stats_database(self):
+        """Check stats survive cache flush when stored in database."""
+        component = self.create_component()
+        translation = component.translation_set.get(language_code='cs')
+        self.assertEqual(translation.stats.all, 4)
+        self.assertEqual(component.stats.all, 12)
+        cache.delete_many([translation.stats.cache_key,
+                           component.stats.cache_key])
+        translation = Translation.objects.get(pk=translation.pk)
+        component = Component.objects.get(pk=component.pk)
+        prefetch_stats([translation.stats, component.stats])
+        self.assertEqual(translation.stats.get_data()['all'], 4)
+        self.assertEqual(component.stats.get_data()['all'], 12)
+        translation.stats.invalidate()
+        self.assertFalse(
+            StoredStats.objects.filter(
+                key=translation.stats.cache_key
+            ).exists()
+        )
+
+    @override_settings(STATS_DATABASE=True)
+    def test_stats_database_delta(self):
+        """Check stats in database are updated by reconcile."""
+        component = self.create_component()
+        translation = component.translation_set.get(language_code='cs')
+        key = translation.stats.cache_key
+        self.assertEqual(translation.stats.all, 4)
+        stored = StoredStats.objects.get(key=key).get_data()
+        translation.stats.apply_delta({'suggestions': 1})
+        self.assertEqual(StoredStats.objects.get(key=key).get_data(), stored)
+        translation = Translation.objects.get(pk=translation.pk)
+        self.assertFalse(translation.stats.reconcile())
+        self.assertEqual(
+            StoredStats.objects.get(key=key).get_data()['suggestions'],
+            stored['suggestions']
+        )
+        # Matching stats are stored as well
+        StoredStats.objects.filter(key=key).update(data='{}')
+        translation = Translation.objects.get(pk=translation.pk)
+        self.assertTrue(translation.stats.reconcile())
+        self.assertEqual(StoredStats.objects.get(key=key).get_data(), stored)
+
+    def test_store_units(self):
+        """Check new and changed units are stored in bulk."""
+        component = self.create_component()
+        translation = component.translation_set.get(language_code='cs')
+        pks = dict(translation.unit_set.values_list('id_hash', 'pk'))
+        new_sources = Change.objects.filter(
+            translation=translation, action=Change.ACTION_NEW_SOURCE
+        )
+        old_changes = set(new_sources.values_list('unit', flat=True))
+        with open(translation.get_filename(), 'r') as handle:
+            content = handle.read()
+        content = content.replace(
+            'msgid "Thank you for using Weblate."\nmsgstr ""',
+            'msgid "Thank you for using Weblate."\n'
+            'msgstr "Dekujeme za pouziti Weblate"'
+        )
+        content += '\n#: main.c:15\nmsgid "New string\\n"\nmsgstr "Novy"\n'
+        with open(translation.get_filename(), 'w') as handle:
+            handle.write(content)
+
+        translation.check_sync()
+
+        # Existing units keep primary keys, new one gets it assigned
+        self.assertEqual(
+            pks,
+            dict(translation.unit_set.filter(
+                id_hash__in=pks
+            ).values_list('id_hash', 'pk'))
+        )
+        changed = translation.unit_set.get(
+            source='Thank you for using Weblate.'
+        )
+        self.assertEqual(changed.target, 'Dekujeme za pouziti Weblate')
+        created = translation.unit_set.get(source='New string\n')
+        self.assertNotIn(created.pk, pks.values())
+
+        # Checks were run for both
+        self.assertTrue(created.has_failing_check)
+        self.assertEqual(
+            set(created.checks().values_list('check', flat=True)),
+            {'end_newline'}
+        )
+        self.assertEqual(
+            set(changed.checks().values_list('check', flat=True)),
+            {'end_stop'}
+        )
+
+        # Only new string is recorded as new source
+        self.assertEqual(
+            set(new_sources.values_list('unit', flat=True)) - old_changes,
+            {created.pk}
+        )
+
+        translation = Translation.objects.get(pk=translation.pk)
+        self.assertEqual(translation.stats.all, 5)
+        self.assertEqual(translation.stats.translated, 2)
+        self.assertTrue(translation.stats.reconcile())
+
     def test_commit_groupping(self):
         component = self.create_component()
         translation = component.translation_set.get(language_code='cs')
@@ -331,6 +506,69 @@ class UnitTest(ModelTestCase):
         unit.translate(request, 'other\r\nstring', STATE_TRANSLATED)
         self.assertEqual(unit.target, 'other\r\nstring')
 
+    def get_check_state(self):
+        return (
+            set(Check.objects.exclude(language=None).values_list(
+                'content_hash', 'language', 'check'
+            )),
+            set(Unit.objects.filter(
+                has_failing_check=True
+            ).values_list('pk', flat=True)),
+        )
+
+    def test_run_checks_bulk(self):
+        expected = self.get_check_state()
+        self.assertTrue(expected[0])
+        self.assertTrue(expected[1])
+        unit = Unit.objects.filter(has_failing_check=False)[0]
+        Check.objects.exclude(language=None).delete()
+        Check.objects.create(
+            content_hash=unit.content_hash,
+            project=unit.translation.component.project,
+            language=unit.translation.language,
+            check='same',
+        )
+        Unit.objects.update(has_failing_check=False)
+        for translation in self.component.translation_set.all():
+            Unit.run_checks_bulk(
+                translation,
+                [
+                    (unit, True, False, False)
+                    for unit in translation.unit_set.prefetch()
+                ],
+                batch_size=2
+            )
+        self.assertEqual(self.get_check_state(), expected)
+
+    def test_run_target_checks(self):
+        other = self.create_po(name='Other', project=self.component.project)
+        units = Unit.objects.filter(
+            source='Hello, world!\n', translation__language_code='cs'
+        )
+        units.filter(translation__component=self.component).update(
+            target='Nazdar svete!\n', state=STATE_TRANSLATED
+        )
+        units.filter(translation__component=other).update(
+            target='Ahoj svete!\n', state=STATE_TRANSLATED
+        )
+        self.component.run_target_checks()
+        self.assertEqual(
+            Check.objects.filter(check='inconsistent').count(), 1
+        )
+        self.assertEqual(units.filter(has_failing_check=True).count(), 2)
+        # Checks are not flagged on units needing editing
+        units.update(has_failing_check=False)
+        units.filter(translation__component=other).update(
+            state=STATE_FUZZY, has_failing_check=True
+        )
+        self.component.run_target_checks()
+        self.assertEqual(units.filter(has_failing_check=True).count(), 1)
+        units.update(state=STATE_TRANSLATED)
+        units.update(target='Ahoj svete!\n')
+        self.component.run_target_checks()
+        self.assertFalse(Check.objects.filter(check='inconsistent').exists())
+        self.assertEqual(units.filter(has_failing_check=True).count(), 0)
+
     def test_flags(self):
         unit = Unit.objects.all()[0]
         unit.flags = 'no-wrap, ignore-same'
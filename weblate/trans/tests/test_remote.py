@@ -23,9 +23,11 @@ import shutil
 import os
 from unittest import SkipTest
 
+from django.test.utils import override_settings
 from django.utils import timezone
 
 from weblate.trans.models import Component
+from weblate.trans.tasks import get_update_status, update_remotes
 from weblate.trans.tests.utils import REPOWEB_URL
 from weblate.trans.tests.test_views import ViewTestCase
 from weblate.vcs.models import VCS_REGISTRY
@@ -237,6 +239,51 @@ class MultiRepoTest(ViewTestCase):
         )
         self.assertEqual(translation.stats.all, 1)
 
+    @override_settings(AUTO_UPDATE=True)
+    def test_update_remotes(self):
+        """Test periodic update of components sharing repository."""
+        self.push_first(False)
+
+        update_remotes()
+
+        translation = self.component2.translation_set.get(
+            language_code='cs'
+        )
+        self.assertEqual(translation.stats.translated, 1)
+        status = get_update_status(self.component2.pk)
+        self.assertEqual(status['failures'], 0)
+        self.assertIsNotNone(status['duration'])
+
+    def test_update_remotes_current(self):
+        """Test that components with current revision are not fetched."""
+        if self.component.repository.get_remote_head() is None:
+            raise SkipTest('Remote can not be queried')
+
+        update_remotes()
+
+        for component in (self.component, self.component2):
+            self.assertIsNone(get_update_status(component.pk)['duration'])
+
+    def test_update_remotes_backoff(self):
+        """Test backing off on failing remote."""
+        shutil.rmtree(getattr(self, '{0}_repo_path'.format(self._vcs)))
+
+        update_remotes()
+        status = get_update_status(self.component.pk)
+        self.assertEqual(status['failures'], 1)
+        self.assertEqual(status['skip'], 0)
+
+        update_remotes()
+        status = get_update_status(self.component.pk)
+        self.assertEqual(status['failures'], 2)
+        self.assertEqual(status['skip'], 1)
+
+        # The component is skipped in this run
+        update_remotes()
+        status = get_update_status(self.component.pk)
+        self.assertEqual(status['failures'], 2)
+        self.assertEqual(status['skip'], 0)
+
 
 class GitBranchMultiRepoTest(MultiRepoTest):
     _vcs = 'git'
@@ -24,15 +24,20 @@ from __future__ import unicode_literals
 
 import re
 import shutil
-from unittest import TestCase
+from unittest import TestCase, skipUnless
+from whoosh.fields import Schema, NUMERIC, TEXT
 from whoosh.filedb.filestore import FileStorage
+from django.db import connection
 from django.urls import reverse
 from django.test.utils import override_settings
 from django.http import QueryDict
 
+from weblate.trans.models import Unit
 from weblate.utils.ratelimit import reset_rate_limit
 from weblate.trans.tests.test_views import ViewTestCase
-from weblate.trans.search import Fulltext
+from weblate.trans.search import (
+    Fulltext, PostgreSQLFulltext, get_fulltext,
+)
 from weblate.trans.tests.utils import TempDirMixin
 from weblate.utils.state import STATE_FUZZY, STATE_TRANSLATED
 
@@ -386,6 +391,23 @@ class SearchViewTest(ViewTestCase):
         )
 
 
+@skipUnless(
+    connection.vendor == 'postgresql', 'PostgreSQL fulltext not available'
+)
+@override_settings(SEARCH_BACKEND='weblate.trans.search.PostgreSQLFulltext')
+class PostgreSQLSearchViewTest(SearchViewTest):
+    def test_more_like(self):
+        unit = self.get_unit()
+        units = Unit.objects.filter(
+            translation__language=unit.translation.language
+        )
+        self.assertIn(unit.pk, get_fulltext().more_like(unit, units))
+        # Only units from the queryset are ranked
+        self.assertNotIn(
+            unit.pk, get_fulltext().more_like(unit, units.exclude(pk=unit.pk))
+        )
+
+
 class SearchBackendTest(ViewTestCase):
     fake_search = False
 
@@ -404,6 +426,77 @@ class SearchBackendTest(ViewTestCase):
         Fulltext.update_index_unit(unit)
         Fulltext.update_index_unit(unit)
 
+    def test_filter_pages(self):
+        fulltext = get_fulltext()
+        fulltext.PAGE_SIZE = 1
+        units = Unit.objects.filter(translation__component=self.component)
+        expected = units.filter(source__startswith='Hello')
+        self.assertGreater(expected.count(), 1)
+        self.assertEqual(
+            set(fulltext.filter_units(units, 'hello', {'source': True})),
+            set(expected)
+        )
+        self.assertEqual(
+            set(fulltext.filter_units(
+                units, 'hello', {'source': True}, ['cs']
+            )),
+            set(expected)
+        )
+
+    def test_filter_scope(self):
+        fulltext = get_fulltext()
+        fulltext.PAGE_SIZE = 1
+        units = Unit.objects.filter(translation__component=self.component)
+        expected = units.filter(source__startswith='Hello')
+        results = fulltext.filter_units(
+            units, 'hello', {'source': True}, ['cs'], [self.component.pk]
+        )
+        self.assertEqual(results.count(), expected.count())
+        self.assertEqual(len(results[:1]), 1)
+        self.assertIn(results[0], expected)
+        self.assertEqual(
+            set(results.values_list('id', flat=True)),
+            set(expected.values_list('id', flat=True))
+        )
+        # Further filtering is applied to matched pages
+        self.assertEqual(
+            set(results.filter(translation__language__code='cs')),
+            set(expected.filter(translation__language__code='cs'))
+        )
+        # Units from other components are not matched at all
+        results = fulltext.filter_units(
+            units, 'hello', {'source': True}, ['cs'], [self.component.pk + 1]
+        )
+        self.assertFalse(results.exists())
+        self.assertEqual(list(results), [])
+
+    def test_more_like(self):
+        unit = self.get_unit()
+        units = Unit.objects.filter(
+            translation__language=unit.translation.language
+        )
+        fulltext = get_fulltext()
+        self.assertEqual(fulltext.more_like(unit, units), [unit.pk])
+        self.assertEqual(
+            fulltext.more_like(unit, units.exclude(pk=unit.pk)), []
+        )
+
+    def test_more_like_old_index(self):
+        unit = self.get_unit()
+        units = Unit.objects.filter(
+            translation__language=unit.translation.language
+        )
+        fulltext = Fulltext()
+        # Index created by older version without languages
+        fulltext.has_field = lambda index, searcher, field: False
+        self.assertEqual(fulltext.more_like(unit, units), [unit.pk])
+
+    def test_backend(self):
+        self.assertIsInstance(get_fulltext(), Fulltext)
+        with override_settings(
+                SEARCH_BACKEND='weblate.trans.search.PostgreSQLFulltext'):
+            self.assertIsInstance(get_fulltext(), PostgreSQLFulltext)
+
 
 class SearchMigrationTest(TestCase, TempDirMixin):
     """Search index migration testing"""
@@ -444,6 +537,64 @@ class SearchMigrationTest(TestCase, TempDirMixin):
                 set([1])
             )
 
+    def test_missing_fields(self):
+        fulltext = Fulltext()
+        fulltext.storage = self.storage
+        self.storage.create_index(
+            Schema(pk=NUMERIC(stored=True, unique=True), source=TEXT()),
+            'source'
+        )
+        sindex = fulltext.get_source_index()
+        self.assertNotIn('component', sindex.schema)
+        fulltext.update_index([{
+            'pk': 1,
+            'component': 1,
+            'language': 'cs',
+            'source': 'source',
+            'context': '',
+            'location': '',
+            'target': 'target',
+            'comment': '',
+        }])
+        sindex = fulltext.get_source_index()
+        self.assertIn('component', sindex.schema)
+        self.assertIn('language', sindex.schema)
+
+    def test_missing_values(self):
+        fulltext = Fulltext()
+        fulltext.storage = self.storage
+        index = self.storage.create_index(
+            Schema(pk=NUMERIC(stored=True, unique=True), source=TEXT()),
+            'source'
+        )
+        writer = index.writer()
+        writer.add_document(pk=1, source='source')
+        writer.commit()
+        # The documents without component are found by scoped search
+        self.assertEqual(
+            set(fulltext.iterate_search('source', [], {'source': True}, [2])),
+            set([1])
+        )
+        fulltext.update_index([{
+            'pk': 1,
+            'component': 1,
+            'language': 'cs',
+            'source': 'source',
+            'context': '',
+            'location': '',
+            'target': 'target',
+            'comment': '',
+        }])
+        fulltext.get_source_index().optimize()
+        self.assertEqual(
+            set(fulltext.iterate_search('source', [], {'source': True}, [2])),
+            set()
+        )
+        self.assertEqual(
+            set(fulltext.iterate_search('source', [], {'source': True}, [1])),
+            set([1])
+        )
+
     def test_nonexisting(self):
         self.do_test()
 
@@ -19,7 +19,6 @@
 #
 """Charting library for Weblate."""
 
-from django.core.cache import cache
 from django.shortcuts import get_object_or_404
 from django.http import JsonResponse
 from django.utils.translation import pgettext
@@ -30,18 +29,6 @@ from weblate.lang.models import Language
 from weblate.utils.views import get_project_translation
 
 
-def cache_key(*args):
-    def makekey(val):
-        if not val:
-            return '0'
-        if hasattr(val, 'id'):
-            return str(val.id)
-        return str(val)
-    return 'activity-{}'.format('-'.join(
-        [makekey(arg) for arg in args]
-    ))
-
-
 def get_json_stats(request, days, step, project=None, component=None,
                    lang=None, user=None):
     """Parse json stats URL params."""
@@ -74,17 +61,10 @@ def get_json_stats(request, days, step, project=None, component=None,
         language = None
         user = None
 
-    key = cache_key(
+    # Get actual stats, these are incrementally cached in the model
+    return Change.objects.base_stats(
         days, step, project, component, translation, language, user
     )
-    result = cache.get(key)
-    if not result or True:
-        # Get actual stats
-        result = Change.objects.base_stats(
-            days, step, project, component, translation, language, user
-        )
-        cache.set(key, result, 3600 * 4)
-    return result
 
 
 def yearly_activity(request, project=None, component=None, lang=None,
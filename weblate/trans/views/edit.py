@@ -22,6 +22,7 @@ from __future__ import unicode_literals
 
 import time
 
+from django.conf import settings
 from django.contrib.messages import get_messages
 from django.shortcuts import get_object_or_404, redirect
 from django.views.decorators.http import require_POST
@@ -31,6 +32,7 @@ from django.http import HttpResponseRedirect, HttpResponse, JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
 from django.template.loader import render_to_string
+from django.db.models import Q
 
 from weblate.utils import messages
 from weblate.utils.antispam import is_spam
@@ -44,6 +46,7 @@ from weblate.utils.views import (
     get_translation, import_message, show_form_errors,
 )
 from weblate.checks import CHECKS
+from weblate.machinery.tasks import warm_machinery
 from weblate.trans.util import join_plural, render, redirect_next
 from weblate.trans.autotranslate import AutoTranslate
 from weblate.utils.hash import hash_to_checksum
@@ -61,26 +64,14 @@ def get_other_units(unit):
         'source': [],
     }
 
-    kwargs = {
-        'translation__component__project':
-            unit.translation.component.project,
-        'translation__language':
-            unit.translation.language,
-    }
-
-    same = Unit.objects.prefetch().same(unit, False)
-    same_id = Unit.objects.prefetch().filter(
-        id_hash=unit.id_hash,
-        **kwargs
-    )
-    same_source = Unit.objects.prefetch().filter(
-        source=unit.source,
-        **kwargs
+    units = Unit.objects.prefetch().filter(
+        Q(content_hash=unit.content_hash) |
+        Q(id_hash=unit.id_hash) |
+        Q(source_hash=unit.source_hash),
+        translation__component__project=unit.translation.component.project,
+        translation__language=unit.translation.language,
     )
 
-    units = same | same_id | same_source
-    units = units.distinct()
-
     # Is it only this unit?
     if len(units) == 1:
         return result
@@ -517,6 +508,14 @@ def translate(request, project, component, lang):
         messages.error(request, _('Invalid search string!'))
         return redirect(translation)
 
+    # Prefetch machine translations for following units
+    prefetch = settings.MT_PREFETCH_UNITS
+    if (prefetch and (offset - 1) % prefetch == 0 and
+            request.user.has_perm('machinery.view', translation)):
+        unit_ids = search_result['ids'][offset:offset + prefetch]
+        if unit_ids:
+            warm_machinery(translation, unit_ids)
+
     # Show secondary languages for logged in users
     if request.user.is_authenticated:
         secondary = unit.get_secondary_units(request.user)
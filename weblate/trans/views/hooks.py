@@ -35,7 +35,7 @@ from django.http import (
 
 from weblate.trans.models import Component
 from weblate.utils.views import get_project, get_component
-from weblate.trans.tasks import perform_update
+from weblate.trans.tasks import perform_update, request_hook_update
 from weblate.utils.errors import report_error
 from weblate.logger import LOGGER
 
@@ -69,11 +69,13 @@ PAGURE_REPOS = (
 HOOK_HANDLERS = {}
 
 
-def hook_response(response='Update triggered', status='success'):
+def hook_response(response='Update triggered', status='success',
+                  coalesced=None):
     """Generic okay hook response"""
-    return JsonResponse(
-        data={'status': status, 'message': response},
-    )
+    data = {'status': status, 'message': response}
+    if coalesced is not None:
+        data['coalesced'] = coalesced
+    return JsonResponse(data=data)
 
 
 def register_hook(handler):
@@ -91,8 +93,7 @@ def update_component(request, project, component):
     obj = get_component(request, project, component, True)
     if not obj.project.enable_hooks:
         return HttpResponseNotAllowed([])
-    perform_update.delay('Component', obj.pk)
-    return hook_response()
+    return hook_response(coalesced=request_hook_update(obj.pk))
 
 
 @csrf_exempt
@@ -192,21 +193,32 @@ def vcs_service_hook(request, service):
 
     # Trigger updates
     updates = 0
+    coalesced = True
     for obj in components:
         updates += 1
-        LOGGER.info(
-            '%s notification will update %s',
-            service_long_name,
-            obj
-        )
-        perform_update.delay('Component', obj.pk)
+        if request_hook_update(obj.pk):
+            LOGGER.info(
+                '%s notification coalesced with pending update of %s',
+                service_long_name,
+                obj
+            )
+        else:
+            coalesced = False
+            LOGGER.info(
+                '%s notification will update %s',
+                service_long_name,
+                obj
+            )
 
     if updates == 0:
         return hook_response('No matching repositories found!', 'failure')
 
-    return hook_response('Update triggered: {}'.format(
-        ', '.join([obj.full_slug for obj in components])
-    ))
+    return hook_response(
+        'Update triggered: {}'.format(
+            ', '.join([obj.full_slug for obj in components])
+        ),
+        coalesced=coalesced
+    )
 
 
 def bitbucket_extract_changes(data):
@@ -20,6 +20,8 @@
 
 from __future__ import unicode_literals
 
+from django.db.models import Case, Value, When
+
 ESCAPED = frozenset('.\\+*?[^]$(){}=!<>|:-')
 
 
@@ -35,3 +37,29 @@ def re_escape(pattern):
         elif char in ESCAPED:
             string[i] = "\\" + char
     return "".join(string)
+
+
+def bulk_update(queryset, objs, fields, batch_size=1000):
+    """Update given fields on objects using as few queries as possible.
+
+    This is similar to QuerySet.bulk_update from Django 2.2, but works on
+    older versions as well. Every batch is updated using single UPDATE with
+    CASE expression selecting the value by primary key.
+    """
+    objs = list(objs)
+    model = queryset.model
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start:start + batch_size]
+        updates = {}
+        for name in fields:
+            field = model._meta.get_field(name)
+            updates[field.attname] = Case(
+                *[
+                    When(
+                        pk=obj.pk,
+                        then=Value(getattr(obj, field.attname), field)
+                    ) for obj in batch
+                ],
+                output_field=field
+            )
+        queryset.filter(pk__in=[obj.pk for obj in batch]).update(**updates)
@@ -20,10 +20,14 @@
 
 from __future__ import unicode_literals
 
+from contextlib import contextmanager
 import os.path
 import shutil
 import threading
+from time import time
+import weakref
 
+from django.core.cache import cache
 from django.utils.functional import cached_property
 
 from whoosh.filedb.filestore import FileStorage
@@ -37,6 +41,15 @@ class WhooshIndex(object):
     LOCATION = 'index'
     SCHEMA = None
     THREAD = threading.local()
+    # Time to wait for other writer to release the index lock
+    LOCK_TIMEOUT = 60
+    # Maximal number of index segments kept open by searchers of the
+    # long lived instances in this process, see get_thread_instance
+    MAX_OPEN_SEGMENTS = 100
+    OPEN_INSTANCES = []
+    OPEN_LOCK = threading.Lock()
+    # Number of threads currently using the searcher, see use_searcher
+    users = 0
 
     @classmethod
     def cleanup(cls):
@@ -52,15 +65,133 @@ class WhooshIndex(object):
         if schema is None:
             schema = self.SCHEMA
         try:
-            return self.storage.open_index(name)
+            index = self.storage.open_index(name)
         except (OSError, EmptyIndexError):
             self.storage.create()
             return self.storage.create_index(schema, name)
+        return index
+
+    @staticmethod
+    def add_missing_fields(writer, schema):
+        """Add fields introduced to the schema after index was created.
+
+        This has to be done while holding the writer, so that the schema
+        is not changed by other process meanwhile. The existing documents
+        have the fields empty until they are indexed again.
+        """
+        if isinstance(schema, type):
+            schema = schema()
+        for name in schema.names():
+            if name not in writer.schema:
+                writer.add_field(name, schema[name])
 
     @classmethod
     def get_thread_instance(cls):
+        """Return long lived instance for current thread.
+
+        The searcher of the instance is kept open and can be closed by
+        other threads if it is not in use, see use_searcher.
+        """
         try:
             return cls.THREAD.instance
         except AttributeError:
             cls.THREAD.instance = cls()
+            with cls.OPEN_LOCK:
+                cls.OPEN_INSTANCES.append(weakref.ref(cls.THREAD.instance))
             return cls.THREAD.instance
+
+    @cached_property
+    def searcher(self):
+        """Searcher for the index, it is kept open until closed.
+
+        The subclasses using it have to define index attribute.
+        """
+        return self.index.searcher()
+
+    def close(self):
+        """Close the searcher."""
+        if 'searcher' in self.__dict__:
+            self.__dict__.pop('searcher').close()
+
+    def refresh(self):
+        """Reopen the searcher if the index has been changed.
+
+        It also enforces MAX_OPEN_SEGMENTS limit.
+        """
+        with self.OPEN_LOCK:
+            searcher = self.__dict__.get('searcher')
+            if searcher is not None and not searcher.up_to_date():
+                # This reuses unchanged segments and closes the old searcher
+                self.__dict__['searcher'] = searcher.refresh()
+            self.limit_open_segments()
+
+    @contextmanager
+    def use_searcher(self):
+        """Use the searcher, it is not closed by other threads meanwhile."""
+        with self.OPEN_LOCK:
+            self.users += 1
+            searcher = self.searcher
+        try:
+            yield searcher
+        finally:
+            with self.OPEN_LOCK:
+                self.users -= 1
+
+    def count_segments(self):
+        """Return number of segments opened by the searcher."""
+        searcher = self.__dict__.get('searcher')
+        if searcher is None or searcher.is_closed:
+            return 0
+        return len(searcher.reader().leaf_readers())
+
+    def limit_open_segments(self):
+        """Close least recently used idle searchers over the limit.
+
+        Has to be called with OPEN_LOCK held.
+        """
+        instances = [
+            instance for instance in (
+                ref() for ref in WhooshIndex.OPEN_INSTANCES
+            )
+            if instance is not None and instance is not self
+        ]
+        if self in (ref() for ref in WhooshIndex.OPEN_INSTANCES):
+            instances.append(self)
+        WhooshIndex.OPEN_INSTANCES[:] = [
+            weakref.ref(instance) for instance in instances
+        ]
+        total = sum(instance.count_segments() for instance in instances)
+        for instance in instances:
+            if total <= self.MAX_OPEN_SEGMENTS or instance is self:
+                break
+            if instance.users:
+                continue
+            total -= instance.count_segments()
+            instance.close()
+
+    @contextmanager
+    def open_writer(self, index, schema=None):
+        """Write to the index, waiting for lock held by other writer.
+
+        The changes are commited at the end of the block and the commit
+        time is recorded, see get_commit_time. Fields missing in the index
+        are added when schema is given, see add_missing_fields.
+        """
+        writer = index.writer(timeout=self.LOCK_TIMEOUT)
+        try:
+            if schema is not None:
+                self.add_missing_fields(writer, schema)
+            yield writer
+        except Exception:
+            writer.cancel()
+            raise
+        start = time()
+        writer.commit()
+        cache.set(
+            'index-commit-{}'.format(self.LOCATION), time() - start, None
+        )
+
+    @classmethod
+    def get_commit_time(cls):
+        """Return duration of last index commit in seconds."""
+        return cache.get('index-commit-{}'.format(cls.LOCATION))
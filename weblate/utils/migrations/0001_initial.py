@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 2.1.15 on 2019-02-20 10:12
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=190, unique=True)),
+                ('data', models.TextField()),
+            ],
+        ),
+    ]
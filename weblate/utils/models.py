@@ -20,11 +20,17 @@
 
 from __future__ import absolute_import, unicode_literals
 
+import json
+
 from appconf import AppConf
 
 from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import python_2_unicode_compatible
 
 from weblate.trans.models import Change
 from weblate.utils.decorators import disable_for_loaddata
@@ -45,6 +51,8 @@ class WeblateConf(AppConf):
     RATELIMIT_TRANSLATE_ATTEMPTS = 20
     RATELIMIT_TRANSLATE_WINDOW = 60
 
+    STATS_DATABASE = False
+
     class Meta(object):
         prefix = ''
 
@@ -65,6 +73,39 @@ class CeleryConf(AppConf):
         prefix = 'CELERY'
 
 
+class StoredStatsManager(models.Manager):
+    def get_many(self, keys):
+        """Return dictionary of stored stats for given cache keys."""
+        return {
+            stats.key: stats.get_data() for stats in self.filter(key__in=keys)
+        }
+
+    def store(self, key, data):
+        """Store stats for given cache key."""
+        self.update_or_create(
+            key=key,
+            defaults={'data': json.dumps(data, cls=DjangoJSONEncoder)}
+        )
+
+
+@python_2_unicode_compatible
+class StoredStats(models.Model):
+    """Database copy of cached stats, see STATS_DATABASE."""
+    key = models.CharField(max_length=190, unique=True)
+    data = models.TextField()
+
+    objects = StoredStatsManager()
+
+    def __str__(self):
+        return self.key
+
+    def get_data(self):
+        data = json.loads(self.data)
+        if data.get('last_changed'):
+            data['last_changed'] = parse_datetime(data['last_changed'])
+        return data
+
+
 @receiver(post_save, sender=Change)
 @disable_for_loaddata
 def update_source(sender, instance, created, **kwargs):
@@ -214,6 +214,13 @@ def get_versions():
         '1.0',
     ))
 
+    result.append(get_single(
+        'requests',
+        'https://python-requests.org/',
+        'requests',
+        '2.20.0',
+    ))
+
     result.append(get_single(
         'Whoosh',
         'https://bitbucket.org/mchaput/whoosh/',
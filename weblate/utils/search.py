@@ -46,3 +46,25 @@ class Comparer(object):
         return int(
             100 * (1.0 - (float(distance) / max(len(first), len(second), 1)))
         )
+
+    def similarities(self, first, strings, threshold=0):
+        """Returns similarity of string to each of given strings.
+
+        Strings which can not reach the threshold due to their length are
+        not compared and reported as 0, same strings are compared once.
+        """
+        length = len(first)
+        result = []
+        computed = {}
+        for second in strings:
+            if second not in computed:
+                bound = 100.0 * min(length, len(second))
+                bound /= max(length, len(second), 1)
+                if first == second:
+                    computed[second] = 100
+                elif int(bound) < threshold:
+                    computed[second] = 0
+                else:
+                    computed[second] = self.similarity(first, second)
+            result.append(computed[second])
+        return result
@@ -23,6 +23,7 @@ from __future__ import unicode_literals
 from copy import copy
 from datetime import timedelta
 
+from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db.models import Sum, Count
@@ -52,6 +53,25 @@ BASIC_KEYS = frozenset(
     ['last_changed', 'last_author', 'recent_changes', 'total_changes']
 )
 SOURCE_KEYS = frozenset(list(BASIC_KEYS) + ['source_strings', 'source_words'])
+CACHE_TIMEOUT = 30 * 86400
+UNIT_COUNTERS = (
+    'all', 'fuzzy', 'todo', 'translated', 'nottranslated', 'approved',
+    'allchecks', 'suggestions', 'comments', 'approved_suggestions',
+)
+UNIT_KEYS = frozenset(
+    list(UNIT_COUNTERS) + ['{}_words'.format(x) for x in UNIT_COUNTERS]
+)
+RECONCILE_KEYS = frozenset(list(UNIT_KEYS) + ['total_changes'])
+# Counters stored in separate cache keys to allow atomic updates
+COUNTER_KEYS = frozenset(list(RECONCILE_KEYS) + ['recent_changes'])
+LAST_KEYS = frozenset(('last_changed', 'last_author'))
+# Counters needed to calculate basic percents
+PERCENT_KEYS = frozenset(
+    ['all', 'translated', 'approved', 'fuzzy', 'allchecks'] +
+    ['{}_words'.format(x) for x in (
+        'all', 'translated', 'approved', 'fuzzy', 'allchecks'
+    )]
+)
 
 
 def aggregate(stats, item, stats_obj):
@@ -75,6 +95,53 @@ def zero_stats(keys):
     return stats
 
 
+def get_stored_stats():
+    """Return model for database copy of stats."""
+    from weblate.utils.models import StoredStats
+    return StoredStats
+
+
+def get_unit_counters(unit):
+    """Return set of counters the unit is included in."""
+    result = {'all'}
+    if unit.state >= STATE_TRANSLATED:
+        result.add('translated')
+    else:
+        result.add('todo')
+    if unit.state == STATE_EMPTY:
+        result.add('nottranslated')
+    elif unit.state == STATE_FUZZY:
+        result.add('fuzzy')
+    if unit.state >= STATE_APPROVED:
+        result.add('approved')
+        if unit.has_suggestion:
+            result.add('approved_suggestions')
+    if unit.has_failing_check:
+        result.add('allchecks')
+    if unit.has_suggestion:
+        result.add('suggestions')
+    if unit.has_comment:
+        result.add('comments')
+    return result
+
+
+def get_unit_delta(old, new):
+    """Return difference of counters between two revisions of an unit."""
+    old_counters = get_unit_counters(old)
+    new_counters = get_unit_counters(new)
+    delta = {}
+    for item in old_counters - new_counters:
+        delta[item] = -1
+        delta['{}_words'.format(item)] = -old.num_words
+    for item in new_counters - old_counters:
+        delta[item] = 1
+        delta['{}_words'.format(item)] = new.num_words
+    if old.num_words != new.num_words:
+        for item in old_counters & new_counters:
+            delta['{}_words'.format(item)] = new.num_words - old.num_words
+    return delta
+
+
 def prefetch_stats(queryset):
     objects = list(queryset)
     if not objects:
@@ -95,6 +162,8 @@ class BaseStats(object):
         self._object = obj
         self._data = None
         self._pending_save = False
+        # Counters and last change calculated since last save
+        self._dirty = set()
 
     @property
     def is_loaded(self):
@@ -110,11 +179,25 @@ class BaseStats(object):
         lookup = {i.cache_key: i for i in stats if not i.is_loaded}
         if not lookup:
             return
-        data = cache.get_many(lookup.keys())
-        for item, value in data.items():
-            lookup[item].set_data(value)
-        for item in set(lookup.keys()) - set(data.keys()):
-            lookup[item].set_data({})
+        keys = []
+        for item in lookup.values():
+            keys.extend(item.get_cache_keys())
+        cached = cache.get_many(keys)
+        missing = set()
+        for key, item in lookup.items():
+            data = item.merge_cached(cached)
+            if data is None:
+                missing.add(key)
+            else:
+                item.set_data(data)
+        if missing and settings.STATS_DATABASE:
+            stored = get_stored_stats().objects.get_many(missing)
+            for key, data in stored.items():
+                lookup[key].cache_data(data, data.keys())
+                lookup[key].set_data(data)
+            missing -= set(stored.keys())
+        for key in missing:
+            lookup[key].set_data({})
 
     @cached_property
     def has_review(self):
@@ -144,17 +227,169 @@ class BaseStats(object):
                 self._pending_save = False
         return self._data[name]
 
+    def get_part_key(self, name):
+        return '{}-{}'.format(self.cache_key, name)
+
+    def get_cache_keys(self):
+        """Return cache keys holding the stats.
+
+        The basic stats are stored in the main key, each counter has a
+        separate key so that apply_delta can update them atomically, the
+        last change and stats calculated on demand are stored separately
+        as well.
+        """
+        return [
+            self.cache_key,
+            self.get_part_key('extra'),
+            self.get_part_key('last'),
+        ] + [self.get_part_key(name) for name in COUNTER_KEYS]
+
+    def merge_cached(self, cached):
+        """Build stats from values fetched from the cache.
+
+        Returns None if the stats are not cached.
+        """
+        base = cached.get(self.cache_key)
+        if base is None:
+            return None
+        data = {
+            key: value for key, value in base.items()
+            if key not in COUNTER_KEYS and key not in LAST_KEYS
+        }
+        data.update(cached.get(self.get_part_key('extra'), {}))
+        data.update(cached.get(self.get_part_key('last'), {}))
+        for name in COUNTER_KEYS:
+            value = cached.get(self.get_part_key(name))
+            if value is not None:
+                data[name] = value
+        if PERCENT_KEYS.issubset(data):
+            # Percents are not updated by apply_delta
+            self._data = data
+            self.calculate_basic_percents()
+        else:
+            # Some counters are missing, all basic stats will be calculated
+            # again on access
+            data.pop('all', None)
+        return data
+
+    def cache_data(self, data, names):
+        """Store stats in the cache.
+
+        Only counters and last change listed in names are written, the
+        cached ones might have been updated by apply_delta meanwhile.
+        """
+        base = {}
+        extra = {}
+        for key, value in data.items():
+            if key in COUNTER_KEYS or key in LAST_KEYS:
+                continue
+            if key in self.basic_keys:
+                base[key] = value
+            else:
+                extra[key] = value
+        values = {
+            self.cache_key: base,
+            self.get_part_key('extra'): extra,
+        }
+        for name in COUNTER_KEYS.intersection(names):
+            values[self.get_part_key(name)] = data[name]
+        if LAST_KEYS.intersection(names):
+            values[self.get_part_key('last')] = {
+                key: data.get(key) for key in LAST_KEYS
+            }
+        cache.set_many(values, CACHE_TIMEOUT)
+
     def load(self):
-        return cache.get(self.cache_key, {})
+        data = self.merge_cached(cache.get_many(self.get_cache_keys()))
+        if data is not None:
+            return data
+        if settings.STATS_DATABASE:
+            stored = get_stored_stats().objects.get_many([self.cache_key])
+            if stored:
+                data = stored[self.cache_key]
+                self.cache_data(data, data.keys())
+                return data
+        return {}
 
     def save(self):
         """Save stats to cache."""
-        cache.set(self.cache_key, self._data, 30 * 86400)
+        self.cache_data(self._data, self._dirty)
+        self._dirty = set()
+        if settings.STATS_DATABASE:
+            get_stored_stats().objects.store(self.cache_key, self._data)
+
+    def remove(self):
+        """Remove stats from cache."""
+        self._data = {}
+        self._dirty = set()
+        cache.delete_many(self.get_cache_keys())
+        if settings.STATS_DATABASE:
+            get_stored_stats().objects.filter(key=self.cache_key).delete()
 
     def invalidate(self, language=None):
         """Invalidate local and cache data."""
+        self.remove()
+
+    def apply_delta(self, delta, change=None, language=None):
+        """Update cached counters without calculating them again.
+
+        The counters are atomically incremented in the cache, counters
+        which are not cached are calculated on next access. Stats
+        calculated on demand are dropped as they depend on the counters.
+        Drift caused by calculation running concurrently is fixed by
+        reconcile, which also updates stats stored in the database.
+        """
+        if change is not None:
+            delta = dict(delta, recent_changes=1, total_changes=1)
+        for key, value in delta.items():
+            if key not in COUNTER_KEYS or not value:
+                continue
+            try:
+                cache.incr(self.get_part_key(key), value)
+            except ValueError:
+                # Not cached
+                continue
+        if change is not None:
+            cache.set(
+                self.get_part_key('last'),
+                {
+                    'last_changed': change.timestamp,
+                    'last_author': change.author_id,
+                },
+                CACHE_TIMEOUT
+            )
+        cache.delete(self.get_part_key('extra'))
+        self._data = None
+
+    def reconcile(self):
+        """Compare cached counters with freshly calculated ones.
+
+        Returns False if they do not match, the cache is fixed in such case.
+        The recent changes are always replaced by the fresh value as
+        apply_delta can only increment them, while the old changes
+        should drop out of the counted period. The stats stored in the
+        database are updated as well, apply_delta changes only the cache.
+        """
+        data = self.load()
+        if 'all' not in data:
+            return True
         self._data = {}
-        cache.delete(self.cache_key)
+        self.prefetch_basic()
+        fresh = self._data
+        if all(data.get(key) == fresh[key] for key in RECONCILE_KEYS
+               if key in fresh):
+            self._data = data
+            if data.get('recent_changes') != fresh.get('recent_changes'):
+                self.store('recent_changes', fresh.get('recent_changes'))
+                self.save()
+            elif settings.STATS_DATABASE:
+                get_stored_stats().objects.store(self.cache_key, data)
+            return True
+        self.invalidate()
+        self._data = fresh
+        self._dirty = set(fresh)
+        self.save()
+        return False
 
     def store(self, key, value):
         if self._data is None:
@@ -163,6 +398,7 @@ class BaseStats(object):
             self._data[key] = 0
         else:
             self._data[key] = value
+        self._dirty.add(key)
 
     def calculate_item(self, item):
         """Calculate stats for translation."""
@@ -190,13 +426,17 @@ class BaseStats(object):
             total = self.all_words
         else:
             total = self.all
-        if self.has_review:
-            completed = {'approved', 'approved_words'}
-        else:
-            completed = {'translated', 'translated_words'}
+        zero_complete = False
+        # The review status matters only for empty objects
+        if total == 0:
+            if self.has_review:
+                completed = {'approved', 'approved_words'}
+            else:
+                completed = {'translated', 'translated_words'}
+            zero_complete = base in completed
         self.store(
             item,
-            translation_percent(getattr(self, base), total, base in completed)
+            translation_percent(getattr(self, base), total, zero_complete)
         )
 
     def calculate_basic_percents(self):
@@ -246,6 +486,19 @@ class TranslationStats(BaseStats):
         )
         self._object.language.stats.invalidate()
 
+    def apply_delta(self, delta, change=None, language=None):
+        super(TranslationStats, self).apply_delta(delta, change)
+        self._object.component.stats.apply_delta(
+            delta, change, language=self._object.language
+        )
+        self._object.language.stats.apply_delta(delta, change)
+
+    def update_unit(self, old, new, change=None):
+        """Update stats on change of single unit."""
+        delta = get_unit_delta(old, new)
+        if delta or change is not None:
+            self.apply_delta(delta, change)
+
     @property
     def language(self):
         return self._object.language
@@ -427,6 +680,12 @@ class ComponentStats(LanguageStats):
         for clist in self._object.componentlist_set.all():
             clist.stats.invalidate()
 
+    def apply_delta(self, delta, change=None, language=None):
+        super(ComponentStats, self).apply_delta(delta, change)
+        self._object.project.stats.apply_delta(delta, change, language)
+        for clist in self._object.componentlist_set.all():
+            clist.stats.apply_delta(delta, change)
+
     def get_language_stats(self):
         for translation in self.translation_set:
             yield TranslationStats(translation)
@@ -488,6 +747,19 @@ class ProjectStats(BaseStats):
                 self.get_single_language_stats(lang).invalidate()
         GlobalStats().invalidate()
 
+    def apply_delta(self, delta, change=None, language=None):
+        super(ProjectStats, self).apply_delta(delta, change)
+        if language:
+            self.get_single_language_stats(language).apply_delta(
+                delta, change
+            )
+        else:
+            for lang in self._object.languages:
+                self.get_single_language_stats(lang).apply_delta(
+                    delta, change
+                )
+        GlobalStats().apply_delta(delta, change)
+
     @cached_property
     def component_set(self):
         return prefetch_stats(self._object.component_set.all())
@@ -20,10 +20,31 @@
 
 from unittest import TestCase
 
-from weblate.utils.db import re_escape
+from django.test import TestCase as DjangoTestCase
+
+from weblate.lang.models import Language
+from weblate.utils.db import bulk_update, re_escape
 
 
 class DbTest(TestCase):
     def test_re_escape(self):
         self.assertEqual(re_escape('[a-z]'), '\\[a\\-z\\]')
         self.assertEqual(re_escape('a{1,4}'), 'a\\{1,4\\}')
+
+
+class BulkUpdateTest(DjangoTestCase):
+    def test_bulk_update(self):
+        first = Language.objects.create(code='x-first', name='First')
+        second = Language.objects.create(code='x-second', name='Second')
+        first.name = 'Updated'
+        second.direction = 'rtl'
+        bulk_update(
+            Language.objects.all(), [first, second], ('name', 'direction'),
+            batch_size=1
+        )
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.name, 'Updated')
+        self.assertEqual(first.direction, 'ltr')
+        self.assertEqual(second.name, 'Second')
+        self.assertEqual(second.direction, 'rtl')
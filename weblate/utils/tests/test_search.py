@@ -49,3 +49,11 @@ class ComparerTest(TestCase):
             Comparer().similarity('a' * 200000, 'b' * 200000),
             50
         )
+
+    def test_similarities(self):
+        self.assertEqual(
+            Comparer().similarities(
+                'NICHOLAS', ['NICHOLASŸ', 'N', 'NICHOLAS', 'NICHOLASŸ'], 30
+            ),
+            [88, 0, 100, 88]
+        )
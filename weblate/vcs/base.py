@@ -27,6 +27,7 @@ import os.path
 import sys
 import subprocess
 import logging
+import time
 
 from dateutil import parser
 
@@ -46,6 +47,18 @@ from weblate.vcs.ssh import SSH_WRAPPER
 
 LOGGER = logging.getLogger('weblate.vcs')
 
+# Size of chunks used when hashing files
+HASH_CHUNK = 1024 * 1024
+
+# Files modified in last seconds are not cached to avoid racy timestamps
+HASH_RACY = 2
+
+# Maximal number of cached hashes
+HASH_CACHE_SIZE = 10000
+
+# Hashes of objects keyed by metadata of the files, see get_object_hash
+HASH_CACHE = {}
+
 
 class RepositoryException(Exception):
     """Error while working with a repository."""
@@ -234,6 +247,13 @@ class Repository(object):
         self.execute(self._cmd_update_remote)
         self.clean_revision_cache()
 
+    def get_remote_head(self):
+        """Return current revision of the remote branch without fetching it.
+
+        Returns None if this is not supported by the VCS.
+        """
+        return None
+
     def status(self):
         """Return status of the repository."""
         with self.lock:
@@ -355,22 +375,44 @@ class Repository(object):
     @staticmethod
     def update_hash(objhash, filename, extra=None):
         with open(filename, 'rb') as handle:
-            data = handle.read()
-        if extra:
-            objhash.update(extra.encode('utf-8'))
-        objhash.update('blob {0}\0'.format(len(data)).encode('ascii'))
-        objhash.update(data)
+            size = os.fstat(handle.fileno()).st_size
+            if extra:
+                objhash.update(extra.encode('utf-8'))
+            objhash.update('blob {0}\0'.format(size).encode('ascii'))
+            # Read the file in chunks to avoid loading big files in memory
+            for data in iter(lambda: handle.read(HASH_CHUNK), b''):
+                objhash.update(data)
+
+    @staticmethod
+    def get_stat_key(filename):
+        """Return key identifying file content based on its metadata.
+
+        Returns None for recently modified files as further changes within
+        the timestamp resolution would not be noticed.
+        """
+        stat = os.stat(filename)
+        if time.time() - stat.st_mtime < HASH_RACY:
+            return None
+        return (
+            filename,
+            stat.st_size,
+            getattr(stat, 'st_mtime_ns', stat.st_mtime),
+            stat.st_ino,
+        )
 
     def get_object_hash(self, path):
         """Return hash of object in the VCS.
 
         For files in a way compatible with Git, for dirs it behaves differently
-        as we do not need to track some attributes (eg. permissions)."""
+        as we do not need to track some attributes (eg. permissions).
+
+        The hashes are cached based on size, modification time and inode of
+        the files, so unchanged files are not read again.
+        """
         real_path = os.path.join(
             self.path,
             self.resolve_symlinks(path)
         )
-        objhash = hashlib.sha1()
 
         if os.path.isdir(real_path):
             files = []
@@ -380,12 +422,27 @@ class Repository(object):
                     files.append((
                         full_name, os.path.relpath(full_name, self.path)
                     ))
-            for filename, name in sorted(files):
-                self.update_hash(objhash, filename, name)
+            files.sort()
         else:
-            self.update_hash(objhash, real_path)
+            files = [(real_path, None)]
 
-        return objhash.hexdigest()
+        keys = tuple(self.get_stat_key(filename) for filename, name in files)
+        if None in keys:
+            keys = None
+        elif keys in HASH_CACHE:
+            return HASH_CACHE[keys]
+
+        objhash = hashlib.sha1()
+        for filename, name in files:
+            self.update_hash(objhash, filename, name)
+        result = objhash.hexdigest()
+
+        if keys is not None:
+            if len(HASH_CACHE) >= HASH_CACHE_SIZE:
+                HASH_CACHE.clear()
+            HASH_CACHE[keys] = result
+
+        return result
 
     def configure_remote(self, pull_url, push_url, branch):
         """Configure remote repository."""
@@ -20,18 +20,158 @@
 """Git based version control system abstraction for Weblate needs."""
 
 from __future__ import unicode_literals
+import atexit
 import email.utils
 import os
 import os.path
+import subprocess
+import threading
+import time
 
 from defusedxml import ElementTree
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.functional import cached_property
 
 from weblate.vcs.base import Repository, RepositoryException
 from weblate.vcs.gpg import get_gpg_sign_key
 
+# Seconds after which idle git cat-file processes are stopped
+BATCH_IDLE = 60
+
+# Running git cat-file processes for repository paths
+BATCHES = {}
+BATCHES_LOCK = threading.Lock()
+
+# Seconds to keep cached counts of missing and outgoing commits
+COUNTS_TIMEOUT = 7 * 86400
+
+
+class GitBatch(object):
+    """Long running git cat-file process for reading objects.
+
+    The process is started on first use and stopped when it has not been
+    used for BATCH_IDLE seconds.
+    """
+    def __init__(self, path, env):
+        self.path = path
+        self.env = env
+        self.process = None
+        self.timer = None
+        self.last_used = 0
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+
+    def start(self):
+        with open(os.devnull, 'wb') as devnull:
+            self.process = subprocess.Popen(
+                ['git', 'cat-file', '--batch'],
+                cwd=self.path,
+                env=self.env,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=devnull,
+            )
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except (IOError, OSError):
+            pass
+        self.process.wait()
+        self.process.stdout.close()
+        self.process = None
+
+    def close(self):
+        """Stop the process, it will be started again on next use."""
+        with self.lock:
+            self.stop()
+
+    def schedule(self, delay):
+        self.timer = threading.Timer(delay, self.check_idle)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def check_idle(self):
+        with self.lock:
+            self.timer = None
+            remaining = self.last_used + BATCH_IDLE - time.time()
+            if remaining > 0:
+                self.schedule(remaining)
+            else:
+                self.stop()
+
+    def read(self, name):
+        """Return tuple of object id, type and content for object name.
+
+        Returns None if there is no such object, raises RepositoryException
+        if git fails to process the name.
+        """
+        with self.lock:
+            if self.process is None:
+                self.start()
+            if self.timer is None:
+                self.schedule(BATCH_IDLE)
+            self.last_used = time.time()
+            try:
+                self.process.stdin.write(name.encode('utf-8') + b'\n')
+                self.process.stdin.flush()
+                header = self.process.stdout.readline()
+            except (IOError, OSError):
+                header = b''
+            if not header:
+                # Git terminates on some errors, eg. when resolving upstream
+                # of branch without one
+                self.stop()
+                raise RepositoryException(
+                    128, 'fatal: failed to resolve {0}'.format(name), ''
+                )
+            parts = header.decode('utf-8').split()
+            if len(parts) != 3 or not parts[2].isdigit():
+                # Missing or ambiguous object
+                return None
+            data = self.process.stdout.read(int(parts[2]))
+            # Skip trailing newline
+            self.process.stdout.read(1)
+            return parts[0], parts[1], data
+
+
+def get_batch(path, env):
+    """Return shared git cat-file reader for repository path."""
+    with BATCHES_LOCK:
+        # The process inherited from parent process can not be shared
+        if path not in BATCHES or BATCHES[path].pid != os.getpid():
+            BATCHES[path] = GitBatch(path, env)
+        return BATCHES[path]
+
+
+def close_batch(path):
+    """Stop git cat-file reader for repository path."""
+    with BATCHES_LOCK:
+        batch = BATCHES.pop(path, None)
+    if batch is not None and batch.pid == os.getpid():
+        batch.close()
+
+
+def reset_batches():
+    """Forget git cat-file readers of the parent process after fork."""
+    global BATCHES_LOCK
+    BATCHES.clear()
+    BATCHES_LOCK = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_batches)
+
+
+@atexit.register
+def close_batches():
+    for path in list(BATCHES):
+        close_batch(path)
+
 
 class GitRepository(Repository):
     """Repository implementation for Git."""
@@ -51,6 +191,8 @@ class GitRepository(Repository):
     default_branch = 'master'
     ref_to_remote = '..{0}'
     ref_from_remote = '{0}..'
+    refs_stamp = None
+    last_counts = None
 
     def is_valid(self):
         """Check whether this is a valid repository."""
@@ -61,6 +203,7 @@ class GitRepository(Repository):
 
     def init(self):
         """Initialize the repository."""
+        close_batch(self.path)
         self._popen(['init', self.path])
 
     def check_config(self):
@@ -71,6 +214,7 @@ class GitRepository(Repository):
     @classmethod
     def _clone(cls, source, target, branch=None):
         """Clone repository."""
+        close_batch(target)
         cls._popen([
             'clone',
             '--depth', '1',
@@ -108,13 +252,147 @@ class GitRepository(Repository):
         else:
             self.execute(['rebase', self.get_remote_branch_name()])
 
+    def execute(self, args, needs_lock=True, fullcmd=False):
+        """Execute command and caches its output.
+
+        Any command executed with lock held can change the repository, so
+        cached lookups are dropped.
+        """
+        try:
+            return super(GitRepository, self).execute(
+                args, needs_lock, fullcmd
+            )
+        finally:
+            if needs_lock:
+                self.clean_revision_cache()
+                close_batch(self.path)
+
+    def clean_revision_cache(self):
+        super(GitRepository, self).clean_revision_cache()
+        self.refs.clear()
+
+    @cached_property
+    def refs(self):
+        """Cache of resolved revisions, see resolve."""
+        return {}
+
+    def get_refs_stamp(self):
+        """Return state of files storing HEAD and the branch references.
+
+        Git updates references by renaming lock files over them, so inode
+        and modification time change whenever any process updates them.
+        """
+        gitdir = os.path.join(self.path, '.git')
+        if not os.path.isdir(gitdir):
+            gitdir = self.path
+        result = []
+        for name in (
+                'HEAD',
+                'packed-refs',
+                os.path.join('refs', 'heads', self.branch),
+                os.path.join('refs', 'remotes', 'origin', self.branch)):
+            try:
+                stat = os.stat(os.path.join(gitdir, name))
+                result.append((stat.st_ino, stat.st_mtime))
+            except OSError:
+                result.append(None)
+        return tuple(result)
+
+    def read_object(self, name):
+        """Read object from the repository using git cat-file."""
+        return get_batch(self.path, self._getenv()).read(name)
+
+    def resolve(self, rev):
+        """Return object id for revision or None if it does not exist.
+
+        The resolved revisions are cached until the references are
+        changed, missing revisions are not cached as they can be created
+        by other processes.
+        """
+        stamp = self.get_refs_stamp()
+        if stamp != self.refs_stamp:
+            self.refs.clear()
+            self.refs_stamp = stamp
+        if rev not in self.refs:
+            result = self.read_object(rev)
+            if result is None:
+                return None
+            self.refs[rev] = result[0]
+        return self.refs[rev]
+
+    def get_last_revision(self):
+        revision = self.resolve('HEAD')
+        if revision is None:
+            raise RepositoryException(128, 'fatal: bad revision HEAD', '')
+        return revision
+
+    @cached_property
+    def last_remote_revision(self):
+        """Return last remote revision."""
+        revision = self.resolve('@{upstream}')
+        if revision is None:
+            raise RepositoryException(
+                128, 'fatal: bad revision @{upstream}', ''
+            )
+        return revision
+
+    def get_remote_head(self):
+        """Return current revision of the remote branch without fetching it."""
+        output = self.execute(
+            ['ls-remote', 'origin', 'refs/heads/{0}'.format(self.branch)],
+            needs_lock=False
+        )
+        if not output:
+            return None
+        return output.split()[0]
+
     def has_rev(self, rev):
         try:
-            self.execute(['rev-parse', '--verify', rev], needs_lock=False)
-            return True
+            return self.resolve(rev) is not None
         except RepositoryException:
             return False
 
+    def get_counts(self):
+        """Return tuple with number of missing and outgoing commits.
+
+        The counts depend only on the local and remote revisions, so they
+        are cached for this pair and counting is done only when any of them
+        has changed. The last counts are also kept on the instance to avoid
+        cache lookup when both counts are needed.
+        """
+        remote = self.get_remote_branch_name()
+        key = None
+        head = self.resolve('HEAD')
+        remote_head = self.resolve(remote)
+        if head is not None and remote_head is not None:
+            key = 'git-counts-{0}-{1}'.format(head, remote_head)
+            if self.last_counts is not None and self.last_counts[0] == key:
+                return self.last_counts[1]
+            result = cache.get(key)
+            if result is not None:
+                self.last_counts = (key, result)
+                return result
+        outgoing, missing = self.execute(
+            [
+                'rev-list', '--left-right', '--count',
+                'HEAD...{0}'.format(remote)
+            ],
+            needs_lock=False
+        ).split()
+        result = (int(missing), int(outgoing))
+        if key is not None:
+            cache.set(key, result, COUNTS_TIMEOUT)
+            self.last_counts = (key, result)
+        return result
+
+    def count_missing(self):
+        """Count missing commits."""
+        return self.get_counts()[0]
+
+    def count_outgoing(self):
+        """Count outgoing commits."""
+        return self.get_counts()[1]
+
     def merge(self, abort=False, message=None):
         """Merge remote branch or reverts the merge."""
         tmp = 'weblate-merge-tmp'
@@ -352,10 +630,16 @@ class GitRepository(Repository):
 
     def get_file(self, path, revision):
         """Return content of file at given revision."""
-        return self.execute(
-            ['show', '{0}:{1}'.format(revision, path)],
-            needs_lock=False
-        )
+        result = self.read_object('{0}:{1}'.format(revision, path))
+        if result is None:
+            raise RepositoryException(
+                128,
+                'fatal: path {0} does not exist in {1}'.format(
+                    path, revision
+                ),
+                ''
+            )
+        return result[2].decode('utf-8')
 
     def cleanup(self):
         """Remove not tracked files from the repository."""
@@ -457,9 +741,14 @@ class SubversionRepository(GitRepository):
             self.execute(self._cmd_update_remote + ['--parent'])
         self.clean_revision_cache()
 
+    def get_remote_head(self):
+        """Subversion remote can not be queried without fetching."""
+        return None
+
     @classmethod
     def _clone(cls, source, target, branch=None):
         """Clone svn repository with git-svn."""
+        close_batch(target)
         args, revision = cls.get_remote_args(source, target)
         if revision:
             args.insert(0, revision)
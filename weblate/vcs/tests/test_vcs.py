@@ -23,15 +23,17 @@ from __future__ import unicode_literals
 import tempfile
 import shutil
 import os.path
+import time
 from unittest import SkipTest, TestCase
 
+from django.core.cache import cache
 from django.utils import timezone
 
 from weblate.trans.tests.utils import RepoTestMixin
-from weblate.vcs.base import RepositoryException
+from weblate.vcs.base import HASH_CACHE, RepositoryException
 from weblate.vcs.git import (
     GitRepository, GitWithGerritRepository, GithubRepository,
-    SubversionRepository
+    SubversionRepository, get_batch,
 )
 from weblate.vcs.mercurial import HgRepository
 from weblate.trans.tests.utils import get_test_file, TempDirMixin
@@ -286,6 +288,25 @@ class VCSGitTest(TestCase, RepoTestMixin, TempDirMixin):
         self.test_commit()
         self.assertTrue(self.repo.needs_push())
 
+    def test_counts_cache(self):
+        if not isinstance(self.repo, GitRepository):
+            raise SkipTest('Not using git')
+        self.assertEqual(self.repo.get_counts(), (0, 0))
+        key = 'git-counts-{0}-{1}'.format(
+            self.repo.last_revision,
+            self.repo.resolve(self.repo.get_remote_branch_name())
+        )
+        self.assertEqual(cache.get(key), (0, 0))
+        # The cached value is used for same revisions
+        cache.set(key, (1, 2))
+        repo = self._class(self.repo.path, self.repo.branch)
+        self.assertEqual(repo.count_missing(), 1)
+        self.assertEqual(repo.count_outgoing(), 2)
+        cache.delete(key)
+        # New revision is counted
+        self.test_commit()
+        self.assertEqual(self.repo.get_counts(), (0, 1))
+
     def test_is_supported(self):
         self.assertTrue(self._class.is_supported())
 
@@ -363,6 +384,18 @@ class VCSGitTest(TestCase, RepoTestMixin, TempDirMixin):
             40
         )
 
+    def test_object_hash_cache(self):
+        filename = os.path.join(self.tempdir, 'README.md')
+        # Recently modified files are not cached
+        os.utime(filename, (time.time() - 10, time.time() - 10))
+        obj_hash = self.repo.get_object_hash('README.md')
+        self.assertIn(obj_hash, HASH_CACHE.values())
+        self.assertEqual(obj_hash, self.repo.get_object_hash('README.md'))
+
+        with open(filename, 'a') as handle:
+            handle.write('CHANGE\n')
+        self.assertNotEqual(obj_hash, self.repo.get_object_hash('README.md'))
+
     def test_configure_remote(self):
         with self.repo.lock:
             self.repo.configure_remote('pullurl', 'pushurl', 'branch')
@@ -414,6 +447,70 @@ class VCSGitTest(TestCase, RepoTestMixin, TempDirMixin):
             self.repo.get_file('po/cs.po', self.repo.last_revision)
         )
 
+    def test_get_file_missing(self):
+        self.assertRaises(
+            RepositoryException,
+            self.repo.get_file,
+            'po/missing.po',
+            self.repo.last_revision
+        )
+
+    def test_batch(self):
+        if not isinstance(self.repo, GitRepository):
+            raise SkipTest('Not using git')
+        self.assertTrue(self.repo.has_rev('HEAD'))
+        self.assertFalse(self.repo.has_rev('missing'))
+        batch = get_batch(self.repo.path, {})
+        self.assertIsNotNone(batch.process)
+
+        # Idle process is stopped and started again on next use
+        batch.last_used = 0
+        batch.check_idle()
+        self.assertIsNone(batch.process)
+        self.assertIn(
+            'msgid',
+            self.repo.get_file('po/cs.po', self.repo.last_revision)
+        )
+        self.assertIsNotNone(batch.process)
+
+        # Writes stop the process and drop cached revisions
+        with self.repo.lock:
+            self.repo.set_committer('Foo Bar', 'foo@example.net')
+        self.assertIsNone(batch.process)
+        self.assertEqual(self.repo.refs, {})
+
+    def test_batch_fork(self):
+        if not isinstance(self.repo, GitRepository):
+            raise SkipTest('Not using git')
+        batch = get_batch(self.repo.path, {})
+        # The process inherited from parent process is not used
+        batch.pid = -1
+        self.assertIsNot(get_batch(self.repo.path, {}), batch)
+        batch.pid = os.getpid()
+        batch.close()
+
+    def test_resolve_changed(self):
+        if not isinstance(self.repo, GitRepository):
+            raise SkipTest('Not using git')
+        head = self.repo.resolve('HEAD')
+        self.assertIsNone(self.repo.resolve('refs/heads/other'))
+        # Repository changed by other process
+        other = self._class(self.repo.path, self.repo.branch)
+        with open(os.path.join(self.repo.path, 'test2'), 'w') as handle:
+            handle.write('SECOND TEST FILE\n')
+        with other.lock:
+            other.set_committer('Second Bar', 'second@example.net')
+            other.commit(
+                'Test commit',
+                'Foo Bar <foo@bar.com>',
+                timezone.now(),
+                ['test2']
+            )
+            other.execute(['branch', 'other'])
+        self.assertNotEqual(self.repo.resolve('HEAD'), head)
+        self.assertEqual(self.repo.resolve('HEAD'), other.resolve('HEAD'))
+        self.assertIsNotNone(self.repo.resolve('refs/heads/other'))
+
 
 class VCSGerritTest(VCSGitTest):
     _class = GitWithGerritRepository